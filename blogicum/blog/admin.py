@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.safestring import mark_safe
 
-from .models import Location, Category, Post, Comment
+from .models import Location, Category, Post, Comment, CommentNotification
+from .search import get_search_backend
 
 admin.site.empty_value_display = "Не задано"
 
@@ -23,6 +25,9 @@ class CommentAdmin(admin.TabularInline):
     )
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("author")
+
 
 @admin.register(Post)
 class PostAdmin(BlogAdmin):
@@ -60,17 +65,20 @@ class PostAdmin(BlogAdmin):
         "image",
     )
     readonly_fields = ("get_post_img",)
+    list_select_related = ("author", "category", "location")
     save_on_top = True
 
+    def get_search_results(self, request, queryset, search_term):
+        """Искать по поисковому индексу вместо LIKE по title и text."""
+        if not search_term.strip():
+            return queryset, False
+        return get_search_backend().filter(queryset, search_term), False
+
     @admin.display(description="Изображение")
     def get_post_img(self, obj):
         if obj.image:
             return mark_safe(f"<img src='{obj.image.url}' width=50")
 
-    @admin.display(description="Комментарии")
-    def comment_count(self, obj):
-        return obj.comments.count()
-
 
 @admin.register(Category)
 class CategoryAdmin(BlogAdmin):
@@ -92,13 +100,42 @@ class LocationAdmin(BlogAdmin):
         "name",
         "is_published",
         "created_at",
+        "post_count",
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            post_count=Count("posts"))
+
+    @admin.display(description="Публикации", ordering="post_count")
+    def post_count(self, obj):
+        return obj.post_count
+
 
 @admin.register(Comment)
 class CommentAdminPanel(admin.ModelAdmin):
     """Интерфейс для отдельного просмотра комментариев."""
 
     list_display = ("text", "author", "post", "created_at")
+    list_select_related = ("author", "post")
     readonly_fields = ("text", "author", "post", "created_at")
     list_filter = ("author", "post")
+
+
+@admin.register(CommentNotification)
+class CommentNotificationAdmin(admin.ModelAdmin):
+    """Интерфейс для очереди уведомлений о комментариях."""
+
+    list_display = ("recipient", "post", "status", "attempts", "send_after")
+    list_select_related = ("recipient", "post")
+    list_filter = ("status",)
+    readonly_fields = (
+        "comment",
+        "post",
+        "recipient",
+        "post_url",
+        "attempts",
+        "sent_at",
+        "last_error",
+        "created_at",
+    )
@@ -0,0 +1,242 @@
+"""Асинхронные варианты читающих страниц блога для ASGI.
+
+Под ASGI их подключает blogicum.asgi_urls вместо MainPostListView,
+CategoryPostListView, UserPostsListView и PostDetailView: синхронное
+представление Django выполнял бы целиком в потоке-адаптере, а эти
+работают в цикле событий и отдают ORM-запросы и рендеринг в пул
+core.db.run_db. Независимые запросы страницы (записи, общее число,
+боковая панель категорий) выполняются параллельно. Кэш страниц ленты,
+ответы 304 Not Modified и чтение из реплик работают так же, как у
+синхронных представлений.
+"""
+import asyncio
+import functools
+
+from django.contrib.auth import get_user
+from django.http import Http404, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from core.db import replica_reads, run_db
+from core.mixins import get_feed_page, store_feed_page
+from core.utils import (
+    COMMENT_ORDERING,
+    aget_page,
+    annotate_visibility,
+    category_state,
+    get_cursor_page,
+    get_feed_state,
+    get_validators,
+    make_validators,
+    post_all_query,
+    post_published_query,
+    profile_state,
+    publish_due_posts,
+)
+from .forms import CommentEditForm
+from .models import Category, Comment, Post, User
+from .views import (
+    CategoryPostListView,
+    MainPostListView,
+    PostDetailView,
+    UserPostsListView,
+)
+
+
+def read_only(view):
+    """Разрешить асинхронному представлению только GET и HEAD.
+
+    Чтения такого представления уходят в реплики, как у синхронных
+    представлений с core.db.replica_reads.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        return await view(request, *args, **kwargs)
+
+    return replica_reads(wrapper)
+
+
+async def load_user(request):
+    """Загрузить пользователя сессии в request.user.
+
+    AuthenticationMiddleware загружает его лениво, а запросы к базе из
+    цикла событий запрещены.
+    """
+    request.user = await run_db(get_user, request)
+    return request.user
+
+
+def not_modified(request, etag, last_modified):
+    """Вернуть 304 Not Modified, если страница не изменилась, иначе None.
+
+    Проверка та же, что в ConditionalGetMixin (декоратор condition).
+    """
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+
+
+async def render_page(request, template_name, context, etag, last_modified):
+    """Отрендерить страницу в пуле и добавить ей ETag и Last-Modified."""
+    response = await run_db(render, request, template_name, context)
+    if etag:
+        response["ETag"] = quote_etag(etag)
+    if last_modified:
+        response["Last-Modified"] = http_date(
+            int(last_modified.timestamp()))
+    return response
+
+
+@read_only
+async def index(request):
+    """Главная страница; для анонимов отдаётся из кэша страниц ленты."""
+    user = await load_user(request)
+    if request.method != "GET" or user.is_authenticated:
+        return await _index(request, user)
+    key, response = await run_db(
+        get_feed_page, request, MainPostListView.feed_cache_name)
+    fresh = response is None
+    if fresh:
+        response = await _index(request, user)
+    await run_db(store_feed_page, key, response, fresh)
+    return response
+
+
+async def _index(request, user):
+    queryset = await run_db(post_published_query)
+    etag, last_modified = await run_db(
+        get_validators, queryset, user, feed="index")
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    page_obj = await aget_page(
+        request, queryset, MainPostListView.paginate_by, feed="index")
+    return await render_page(
+        request,
+        MainPostListView.template_name,
+        {"page_obj": page_obj},
+        etag,
+        last_modified,
+    )
+
+
+@read_only
+async def category_posts(request, category_slug):
+    user = await load_user(request)
+    published = await run_db(post_published_query)
+    category, sidebar, state = await asyncio.gather(
+        run_db(
+            get_object_or_404,
+            Category,
+            slug=category_slug,
+            is_published=True,
+        ),
+        run_db(list, Category.objects.filter(
+            slug__in=CategoryPostListView.sidebar_slugs)),
+        run_db(
+            get_feed_state,
+            published.filter(category__slug=category_slug),
+            f"category:{category_slug}",
+        ),
+    )
+    etag, last_modified = make_validators(
+        state, user, *category_state(category, sidebar))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    page_obj = await aget_page(
+        request,
+        published.filter(category=category),
+        CategoryPostListView.paginate_by,
+        feed=f"category:{category.slug}",
+    )
+    extra_categories = [item for item in sidebar if item.is_published]
+    return await render_page(
+        request,
+        CategoryPostListView.template_name,
+        {
+            "page_obj": page_obj,
+            "category": category,
+            "extra_categories": extra_categories,
+        },
+        etag,
+        last_modified,
+    )
+
+
+@read_only
+async def profile(request, username):
+    user = await load_user(request)
+    published = await run_db(post_published_query)
+    author = await run_db(get_object_or_404, User, username=username)
+    if author == user:
+        validator_queryset = Post.objects.filter(author=author)
+        queryset = post_all_query().filter(author=author)
+        feed = f"author:{author.pk}:all"
+    else:
+        validator_queryset = published.filter(author=author)
+        queryset = published.filter(author=author)
+        feed = f"author:{author.pk}"
+    state = await run_db(get_feed_state, validator_queryset, feed)
+    etag, last_modified = make_validators(
+        state, user, *profile_state(author))
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    page_obj = await aget_page(
+        request, queryset, UserPostsListView.paginate_by, feed=feed)
+    return await render_page(
+        request,
+        UserPostsListView.template_name,
+        {"page_obj": page_obj, "profile": author},
+        etag,
+        last_modified,
+    )
+
+
+@read_only
+async def post_detail(request, post_id):
+    """Страница поста; пост и комментарии читаются параллельно."""
+    user = await load_user(request)
+    await run_db(publish_due_posts)
+    etag, last_modified = await run_db(
+        get_validators, Post.objects.filter(pk=post_id), user,
+        feed=f"post:{post_id}",
+    )
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    post, comments = await asyncio.gather(
+        run_db(
+            get_object_or_404,
+            annotate_visibility(post_all_query()),
+            pk=post_id,
+        ),
+        run_db(
+            get_cursor_page,
+            Comment.objects.filter(post_id=post_id).select_related("author"),
+            None,
+            PostDetailView.comments_paginate_by,
+            ordering=COMMENT_ORDERING,
+        ),
+    )
+    if not post.is_visible and post.author_id != user.pk:
+        raise Http404
+    context = {"object": post, "post": post, "comments": comments}
+    if post.is_visible:
+        context["flag"] = True
+        context["form"] = CommentEditForm()
+    return await render_page(
+        request,
+        PostDetailView.template_name,
+        context,
+        etag,
+        last_modified,
+    )
@@ -0,0 +1,127 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import timezone
+
+from blog.models import Category, Location, Post, User
+
+SOURCE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+# Загрузчики, которые сравнивает бенчмарк; «default» — поведение Django
+# 3.2 без явных loaders при DEBUG = True.
+LOADER_CONFIGS = {
+    "default": SOURCE_LOADERS,
+    "cached": [
+        ("django.template.loaders.cached.Loader", SOURCE_LOADERS),
+    ],
+    "cached+inline": [
+        ("django.template.loaders.cached.Loader", [
+            ("core.loaders.InlineIncludeLoader", SOURCE_LOADERS),
+        ]),
+    ],
+}
+
+
+def get_posts(count):
+    """Вернуть несохранённые посты для отрисовки без запросов к БД."""
+    now = timezone.now()
+    author = User(username="author")
+    category = Category(
+        title="Категория", slug="category", is_published=True, updated_at=now)
+    location = Location(name="Место", is_published=True, updated_at=now)
+    return [
+        Post(
+            id=pk,
+            title=f"Пост {pk}",
+            text="Текст поста " * 30,
+            pub_date=now,
+            updated_at=now,
+            author=author,
+            category=category,
+            location=location,
+            comment_count=pk,
+        )
+        for pk in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    """Микробенчмарк отрисовки ленты blog/index.html.
+
+    Страница отрисовывается с posts карточками и без них для каждой
+    конфигурации загрузчиков из LOADER_CONFIGS; шаблон, как и в
+    представлении, запрашивается у движка при каждой отрисовке. Время
+    одной карточки — разница между ними, делённая на число карточек.
+    Кэш фрагментов очищается перед каждой отрисовкой, если не указан
+    --warm-cache.
+    """
+
+    help = "Сравнить время отрисовки карточки поста в ленте."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--posts",
+            type=int,
+            default=10,
+            help="Число карточек на странице.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=200,
+            help="Число отрисовок страницы.",
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Не очищать кэш фрагментов (карточек) между отрисовками.",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        request.resolver_match = resolve("/")
+        posts = get_posts(options["posts"])
+        for name, loaders in LOADER_CONFIGS.items():
+            engine = self.get_engine(loaders)
+            full = self.measure(engine, request, posts, options)
+            empty = self.measure(engine, request, [], options)
+            per_card = (full - empty) / len(posts) * 1e6
+            self.stdout.write(
+                f"{name}: {full * 1e3:.2f} мс на страницу, "
+                f"{per_card:.0f} мкс на карточку"
+            )
+
+    def get_engine(self, loaders):
+        config = settings.TEMPLATES[0]
+        return DjangoTemplates({
+            "NAME": "bench",
+            "DIRS": config["DIRS"],
+            "APP_DIRS": False,
+            "OPTIONS": {**config["OPTIONS"], "loaders": loaders},
+        })
+
+    def measure(self, engine, request, posts, options):
+        """Вернуть среднее время отрисовки страницы в секундах."""
+        page = Paginator(posts, max(len(posts), 1)).page(1)
+        context = {"page_obj": page, "page_params": ""}
+        fragments = caches["template_fragments"]
+        engine.get_template("blog/index.html").render(context, request)
+        elapsed = 0
+        for _ in range(options["repeat"]):
+            if not options["warm_cache"]:
+                fragments.clear()
+            start = time.perf_counter()
+            engine.get_template("blog/index.html").render(context, request)
+            elapsed += time.perf_counter() - start
+        return elapsed / options["repeat"]
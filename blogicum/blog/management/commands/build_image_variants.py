@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from core.images import build_image_variants
+
+
+class Command(BaseCommand):
+    """Построить уменьшенные копии изображений уже загруженных постов.
+
+    Новые изображения обрабатываются при сохранении поста; команда нужна
+    для постов, загруженных раньше, и для пересборки после смены
+    POST_IMAGE_WIDTHS или POST_IMAGE_QUALITY.
+    """
+
+    help = "Создать JPEG- и WebP-варианты изображений постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "post_ids",
+            nargs="*",
+            type=int,
+            help="id постов для обработки; по умолчанию — все посты.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Обрабатывать только посты без вариантов изображения.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+        if options["post_ids"]:
+            posts = posts.filter(pk__in=options["post_ids"])
+        if options["missing"]:
+            posts = posts.filter(image_variants={})
+        built = 0
+        for post in posts.only("pk", "image").iterator():
+            try:
+                variants = build_image_variants(post.image)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f"Пост {post.pk}: {error}")
+                continue
+            Post.objects.filter(pk=post.pk).update(image_variants=variants)
+            built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработано изображений: {built}."))
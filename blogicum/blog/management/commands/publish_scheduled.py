@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.utils import next_publication_date, publish_scheduled_posts
+
+
+class Command(BaseCommand):
+    """Перевести в ленту отложенные посты, дата публикации которых наступила.
+
+    С ключом --loop команда работает как фоновый процесс: спит до даты
+    ближайшей отложенной публикации, но не дольше --interval секунд.
+    """
+
+    help = "Выставить is_live постам с наступившей датой публикации."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать непрерывно.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Максимальная пауза между проверками, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_scheduled_posts()
+            if published:
+                self.stdout.write(f"Опубликовано постов: {published}.")
+            if not options["loop"]:
+                break
+            time.sleep(self.get_pause(options["interval"]))
+
+    def get_pause(self, interval):
+        """Вернуть паузу до следующей проверки."""
+        pub_date = next_publication_date()
+        if pub_date is None:
+            return interval
+        seconds = (pub_date - timezone.now()).total_seconds()
+        return min(interval, max(seconds, 0.1))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Перестроить поисковый индекс постов.
+
+    Индекс поддерживается сигналами при сохранении и удалении постов;
+    команда нужна после массового импорта или смены POST_SEARCH_BACKEND.
+    """
+
+    help = "Перестроить поисковый индекс постов."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Индекс перестроен: {type(backend).__name__}."))
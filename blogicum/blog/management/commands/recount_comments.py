@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    """Пересчитать сохранённое количество комментариев у постов.
+
+    Счётчик пересчитывается одним UPDATE с подзапросом, поэтому команда
+    подходит и для исправления расхождений, и для первичного заполнения.
+    """
+
+    help = "Пересчитать Post.comment_count по таблице комментариев."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "post_ids",
+            nargs="*",
+            type=int,
+            help="id постов для пересчёта; по умолчанию — все посты.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options["post_ids"]:
+            posts = posts.filter(pk__in=options["post_ids"])
+        comments = Comment.objects.filter(post=OuterRef("pk")).values(
+            "post").annotate(total=Count("pk")).values("total")
+        updated = posts.update(comment_count=Coalesce(Subquery(comments), 0))
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано постов: {updated}."))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.notifications import send_pending_notifications
+
+
+class Command(BaseCommand):
+    """Отправить накопившиеся уведомления о комментариях.
+
+    Все письма порции отправляются через одно соединение с почтовым
+    сервером. С ключом --loop команда работает как фоновый процесс и
+    переживает ошибки: они пишутся в stderr, а проверка повторяется
+    через --interval секунд.
+    """
+
+    help = "Отправить авторам постов письма о новых комментариях."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать непрерывно.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Пауза между проверками очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=100,
+            help="Наибольшее число писем за одно соединение.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent = send_pending_notifications(options["batch"])
+            except Exception as error:
+                if not options["loop"]:
+                    raise
+                self.stderr.write(f"Ошибка отправки уведомлений: {error!r}")
+                close_old_connections()
+                sent = 0
+            if sent:
+                self.stdout.write(f"Отправлено писем: {sent}.")
+            if sent < options["batch"]:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
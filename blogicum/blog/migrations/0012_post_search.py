@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:09
+
+from django.db import migrations, models, transaction
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    """Создать и заполнить таблицу FTS5, если SQLite её поддерживает.
+
+    Без FTS5 поиск работает по PostSearchTerm; заполнить его можно
+    командой rebuild_search_index.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+                "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts (rowid, title, text) "
+        "SELECT id, title, text FROM blog_post"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_commentnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Терм')),
+                ('weight', models.FloatField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'терм поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+                'default_related_name': 'search_terms',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postsearchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='post_search_term_unique'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.db import migrations, transaction
+from django.db.utils import OperationalError
+
+from core.stemmer import tokenize
+
+FIELD_WEIGHTS = {"title": 5.0, "text": 1.0, "comments": 0.5}
+
+
+def get_documents(apps):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    documents = {
+        pk: {"title": tokenize(title), "text": tokenize(text), "comments": []}
+        for pk, title, text in Post.objects.values_list(
+            "pk", "title", "text").iterator()
+    }
+    for post_id, text in Comment.objects.values_list(
+            "post_id", "text").iterator():
+        documents[post_id]["comments"].extend(tokenize(text))
+    return documents
+
+
+def rebuild_index(apps, schema_editor):
+    """Пересоздать индекс поиска с основами слов и комментариями."""
+    PostSearchTerm = apps.get_model("blog", "PostSearchTerm")
+    PostSearchTerm.objects.all().delete()
+    connection = schema_editor.connection
+    documents = get_documents(apps)
+    if connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute(
+                    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+                    "title, text, comments, tokenize = 'unicode61')"
+                )
+        except OperationalError:
+            pass
+        else:
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO blog_post_fts (rowid, title, text, comments)"
+                    " VALUES (%s, %s, %s, %s)",
+                    [
+                        (pk, *(" ".join(doc[f]) for f in FIELD_WEIGHTS))
+                        for pk, doc in documents.items()
+                    ],
+                )
+            return
+    terms = []
+    for pk, document in documents.items():
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in document[field]:
+                weights[term[:64]] += weight
+        terms.extend(
+            PostSearchTerm(post_id=pk, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+    PostSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+def restore_plain_index(apps, schema_editor):
+    """Вернуть таблицу FTS5 из 0012: заголовок и текст без стемминга."""
+    apps.get_model("blog", "PostSearchTerm").objects.all().delete()
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+                "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts (rowid, title, text) "
+        "SELECT id, title, text FROM blog_post"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_index, restore_plain_index),
+    ]
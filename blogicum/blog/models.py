@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
+from core.jobs import enqueue
 from core.models import BaseModel, BaseTitle
 
 User = get_user_model()
@@ -27,6 +29,34 @@ class Location(BaseModel):
         return self.name
 
 
+class SearchIndexedModel(models.Model):
+    """Модель, поля которой входят в поисковый документ поста.
+
+    Запоминает значения полей search_fields при загрузке из базы, чтобы
+    сигналы поиска обновляли индекс, только если эти поля изменились.
+
+    Атрибуты:
+        - search_fields: Поля, попадающие в поисковый индекс.
+        - indexed_values: Значения этих полей в индексе: загруженные из
+        базы или записанные при последнем сохранении.
+    """
+
+    search_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.indexed_values = {
+            name: instance.__dict__[name]
+            for name in cls.search_fields
+            if name in instance.__dict__
+        }
+        return instance
+
+
 class Category(BaseModel, BaseTitle):
     """Категория.
 
@@ -56,7 +86,7 @@ class Category(BaseModel, BaseTitle):
         return self.title
 
 
-class Post(BaseModel, BaseTitle):
+class Post(BaseModel, BaseTitle, SearchIndexedModel):
     """Публикация.
 
     Атрибуты:
@@ -67,8 +97,17 @@ class Post(BaseModel, BaseTitle):
         - location: Местоположение публикации, может быть пустым.
         - category: Категория публикации, может быть пустой.
         - image: Изображение публикации может быть пустым.
+        - image_variants: Уменьшенные копии изображения в форматах JPEG
+        и WebP; строятся фоновой задачей после загрузки изображения, до
+        этого шаблоны показывают оригинал.
+        - comment_count: Количество комментариев, поддерживается
+        сигналами комментариев.
+        - is_live: Наступила ли дата публикации; вычисляется при сохранении,
+        отложенные посты переводит в ленту publish_scheduled_posts().
     """
 
+    search_fields = ("title", "text")
+
     text = models.TextField(
         verbose_name="Текст",
     )
@@ -103,18 +142,124 @@ class Post(BaseModel, BaseTitle):
         null=True,
         verbose_name="Изображение",
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Варианты изображения",
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев",
+    )
+    is_live = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Дата публикации наступила",
+    )
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         default_related_name = "posts"
         ordering = ("-pub_date",)
+        indexes = (
+            # Ленты опубликованных постов: главная и страница категории.
+            models.Index(
+                fields=("-pub_date", "-id"),
+                condition=models.Q(is_published=True, is_live=True),
+                name="post_feed_idx",
+            ),
+            models.Index(
+                fields=("category", "-pub_date", "-id"),
+                condition=models.Q(is_published=True, is_live=True),
+                name="post_category_feed_idx",
+            ),
+            # Отложенные посты, которые ждут перевода в ленту.
+            models.Index(
+                fields=("pub_date",),
+                condition=models.Q(is_live=False),
+                name="post_scheduled_idx",
+            ),
+            # Профиль автора: все посты автора в порядке ленты.
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_feed_idx",
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_live = self.pub_date <= timezone.now()
+        image_uploaded = bool(self.image) and not self.image._committed
+        if image_uploaded or not self.image:
+            self.image_variants = {}
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = set()
+            if "pub_date" in update_fields:
+                extra.add("is_live")
+            if "image" in update_fields:
+                extra.add("image_variants")
+            kwargs["update_fields"] = {*update_fields, *extra}
+        super().save(*args, **kwargs)
+        if image_uploaded:
+            enqueue(
+                "blog.tasks.build_post_image_variants",
+                self.pk, self.image.name,
+            )
+
+    def get_image_srcset(self, fmt="jpeg"):
+        """Вернуть значение атрибута srcset для вариантов формата fmt."""
+        storage = self.image.storage
+        return ", ".join(
+            f"{storage.url(variant['name'])} {variant['width']}w"
+            for variant in self.image_variants.get(fmt, ())
+        )
+
+    @property
+    def image_srcset(self):
+        return self.get_image_srcset("jpeg")
+
+    @property
+    def image_webp_srcset(self):
+        return self.get_image_srcset("webp")
+
+    @property
+    def image_thumbnail(self):
+        """Наибольший JPEG-вариант для атрибутов src, width и height."""
+        variants = self.image_variants.get("jpeg")
+        if not variants:
+            return None
+        variant = variants[-1]
+        return {**variant, "url": self.image.storage.url(variant["name"])}
+
+    @property
+    def card_version(self):
+        """Версия карточки поста для кэша фрагментов.
 
-class Comment(models.Model):
+        Меняется вместе со всем, что показывает карточка: самим постом,
+        состоянием и названием его категории и местоположения, именем
+        автора и числом комментариев.
+        """
+        parts = [self.updated_at.timestamp(), self.comment_count,
+                 self.author.username]
+        for related in (self.category, self.location):
+            if related is None:
+                parts.append(None)
+            else:
+                parts.extend((
+                    related.pk,
+                    related.is_published,
+                    related.updated_at.timestamp(),
+                ))
+        return ":".join(map(str, parts))
+
+
+class Comment(SearchIndexedModel):
     """Комментарий.
 
     Атрибуты:
@@ -124,6 +269,8 @@ class Comment(models.Model):
         - created_at: Дата и время добавления комментария.
     """
 
+    search_fields = ("text",)
+
     text = models.TextField(
         verbose_name="Комментарий",
     )
@@ -147,6 +294,143 @@ class Comment(models.Model):
         verbose_name_plural = "Комментарии"
         default_related_name = "comments"
         ordering = ("created_at",)
+        indexes = (
+            models.Index(
+                fields=("post", "created_at", "id"),
+                name="comment_post_created_idx",
+            ),
+        )
 
     def __str__(self):
         return f"Комментарий пользователя {self.author}"
+
+
+class PostSearchTerm(models.Model):
+    """Запись инвертированного индекса для поиска по постам.
+
+    Используется, когда в базе нет SQLite FTS5.
+
+    Атрибуты:
+        - term: Терм поискового индекса.
+        - post: Пост, в котором встречается терм.
+        - weight: Вес терма в посте.
+    """
+
+    term = models.CharField(
+        max_length=64,
+        verbose_name="Терм",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Пост",
+    )
+    weight = models.FloatField(
+        verbose_name="Вес",
+    )
+
+    class Meta:
+        verbose_name = "терм поискового индекса"
+        verbose_name_plural = "Поисковый индекс"
+        default_related_name = "search_terms"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("term", "post"),
+                name="post_search_term_unique",
+            ),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class CommentNotification(models.Model):
+    """Уведомление автора поста о новом комментарии (очередь отправки).
+
+    Уведомления одного получателя об одном посте, накопившиеся до
+    отправки, уходят одним письмом-дайджестом.
+
+    Атрибуты:
+        - comment: Новый комментарий.
+        - post: Пост, к которому добавлен комментарий.
+        - recipient: Получатель уведомления — автор поста.
+        - post_url: Абсолютный адрес поста для ссылки в письме.
+        - status: Состояние уведомления.
+        - attempts: Число неудачных попыток отправки.
+        - send_after: Дата и время, раньше которых письмо не отправлять.
+        - sent_at: Дата и время отправки.
+        - last_error: Текст последней ошибки отправки.
+        - created_at: Дата и время постановки в очередь.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Ожидает отправки"),
+        (SENT, "Отправлено"),
+        (FAILED, "Ошибка"),
+    )
+
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        verbose_name="Комментарий",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Пост",
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Получатель",
+    )
+    post_url = models.URLField(
+        max_length=2048,
+        verbose_name="Адрес поста",
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Неудачных попыток",
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Отправить не раньше",
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Отправлено",
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Добавлено",
+    )
+
+    class Meta:
+        verbose_name = "уведомление о комментарии"
+        verbose_name_plural = "Уведомления о комментариях"
+        default_related_name = "notifications"
+        ordering = ("created_at", "id")
+        indexes = (
+            models.Index(
+                fields=("recipient", "post", "send_after"),
+                condition=models.Q(status="pending"),
+                name="notification_pending_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.recipient} ← {self.comment_id}"
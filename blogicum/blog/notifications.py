@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min
+from django.template.defaultfilters import truncatewords
+from django.utils import timezone
+
+from .models import CommentNotification
+
+FROM_EMAIL = "from@example.com"
+
+
+def queue_comment_notification(comment, post_url):
+    """Поставить в очередь уведомление автора поста о комментарии.
+
+    Письмо уходит не сразу, а через COMMENT_DIGEST_WINDOW секунд, чтобы
+    комментарии, добавленные за это время, попали в один дайджест.
+    """
+    return CommentNotification.objects.create(
+        comment=comment,
+        post=comment.post,
+        recipient=comment.post.author,
+        post_url=post_url,
+        send_after=timezone.now() + timedelta(
+            seconds=settings.COMMENT_DIGEST_WINDOW),
+    )
+
+
+def build_message(notifications):
+    """Собрать письмо по уведомлениям одного получателя об одном посте."""
+    first = notifications[0]
+    if len(notifications) == 1:
+        subject = "New comment"
+        body = (
+            f"Пользователь {first.comment.author} добавил "
+            f"комментарий к посту {first.post.title}.\n"
+            f"Читать комментарий {first.post_url}"
+        )
+    else:
+        subject = "New comments"
+        lines = [
+            f"- {item.comment.author}: {truncatewords(item.comment.text, 10)}"
+            for item in notifications
+        ]
+        body = (
+            f"К посту {first.post.title} добавлено комментариев: "
+            f"{len(notifications)}.\n" + "\n".join(lines) + "\n"
+            f"Читать комментарии {first.post_url}"
+        )
+    return EmailMessage(subject, body, FROM_EMAIL, [first.recipient.email])
+
+
+def get_due_groups(limit):
+    """Вернуть уведомления, готовые к отправке, сгруппированные в письма.
+
+    Группа — все ожидающие уведомления одного получателя об одном посте;
+    она готова, когда наступило send_after самого раннего из них.
+    """
+    pending = CommentNotification.objects.filter(
+        status=CommentNotification.PENDING)
+    rows = (
+        pending.values_list("recipient", "post")
+        .annotate(first=Min("send_after"))
+        .filter(first__lte=timezone.now())
+        .order_by("first")[:limit]
+    )
+    due = {(recipient, post) for recipient, post, _ in rows}
+    if not due:
+        return []
+    groups = {}
+    notifications = pending.filter(
+        recipient__in={recipient for recipient, _ in due},
+        post__in={post for _, post in due},
+    ).select_related("comment__author", "post", "recipient")
+    for notification in notifications:
+        key = (notification.recipient_id, notification.post_id)
+        if key in due:
+            groups.setdefault(key, []).append(notification)
+    return list(groups.values())
+
+
+def send_pending_notifications(limit=100):
+    """Отправить до limit готовых писем через одно соединение.
+
+    Письмо, которое не удалось отправить, откладывается с
+    экспоненциальной паузой; после NOTIFICATION_MAX_ATTEMPTS неудач его
+    уведомления помечаются как ошибочные. Если не удалось открыть само
+    соединение с почтовым сервером, так откладываются все письма
+    порции. Возвращает число отправленных писем.
+    """
+    groups = get_due_groups(limit)
+    if not groups:
+        return 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for group in groups:
+            mark_failed_attempt(
+                [notification.pk for notification in group],
+                max(n.attempts for n in group),
+                error,
+            )
+        return 0
+    sent = 0
+    try:
+        for group in groups:
+            ids = [notification.pk for notification in group]
+            try:
+                connection.send_messages([build_message(group)])
+            except Exception as error:
+                mark_failed_attempt(ids, max(n.attempts for n in group), error)
+                continue
+            CommentNotification.objects.filter(pk__in=ids).update(
+                status=CommentNotification.SENT, sent_at=timezone.now())
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def mark_failed_attempt(ids, attempts, error):
+    """Отложить уведомления после неудачной отправки."""
+    attempts += 1
+    if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        changes = {"status": CommentNotification.FAILED}
+    else:
+        changes = {"send_after": timezone.now() + timedelta(
+            seconds=settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1))}
+    CommentNotification.objects.filter(pk__in=ids).update(
+        attempts=attempts, last_error=repr(error), **changes)
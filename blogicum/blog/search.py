@@ -0,0 +1,312 @@
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from core.stemmer import tokenize
+from core.utils import FEED_ORDERING
+from .models import Comment, Post, PostSearchTerm
+
+FTS_TABLE = "blog_post_fts"
+
+# Веса совпадений в заголовке, тексте поста и комментариях к нему.
+FIELD_WEIGHTS = {"title": 5.0, "text": 1.0, "comments": 0.5}
+
+
+def get_documents(posts):
+    """Вернуть термы полей постов для индексации: {id: {поле: [термы]}}.
+
+    Термы — основы слов без стоп-слов (см. core.stemmer.tokenize); они
+    вычисляются один раз при индексации, а не при каждом запросе.
+    """
+    documents = {
+        post.pk: {
+            "title": tokenize(post.title),
+            "text": tokenize(post.text),
+            "comments": [],
+        }
+        for post in posts
+    }
+    comments = Comment.objects.filter(post_id__in=documents).values_list(
+        "post_id", "text")
+    for post_id, text in comments.iterator():
+        documents[post_id]["comments"].extend(tokenize(text))
+    return documents
+
+
+def remove_terms(terms, removed):
+    """Убрать из списка термов по одному вхождению каждого из removed."""
+    remaining = Counter(removed)
+    kept = []
+    for term in terms:
+        if remaining[term]:
+            remaining[term] -= 1
+        else:
+            kept.append(term)
+    return kept
+
+
+def iter_documents(batch_size=500):
+    """Перебрать документы всех постов порциями."""
+    posts = Post.objects.only("pk", "title", "text").order_by("pk")
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        yield from get_documents(batch).items()
+        last_pk = batch[-1].pk
+
+
+class FTS5SearchBackend:
+    """Поиск по виртуальной таблице SQLite FTS5.
+
+    Таблица хранит под rowid, равным id поста, основы слов заголовка,
+    текста и комментариев; результаты ранжируются по bm25 с весами
+    FIELD_WEIGHTS. Каждая основа запроса ищется как префикс, все слова
+    должны встретиться в посте.
+    """
+
+    def match_query(self, query):
+        return " ".join(
+            '"{}"*'.format(token.replace('"', '""'))
+            for token in tokenize(query)
+        )
+
+    def filter(self, queryset, query):
+        """Оставить в queryset посты, подходящие под запрос."""
+        match = self.match_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (match,),
+        ))
+
+    def search(self, queryset, query):
+        """Вернуть подходящие посты от более релевантных к менее."""
+        match = self.match_query(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            select={"search_rank": f"-bm25({FTS_TABLE}, %s, %s, %s)"},
+            select_params=tuple(FIELD_WEIGHTS.values()),
+            tables=(FTS_TABLE,),
+            where=(
+                f"{FTS_TABLE}.rowid = {table}.id",
+                f"{FTS_TABLE} MATCH %s",
+            ),
+            params=(match,),
+        ).order_by("-search_rank", *FEED_ORDERING)
+
+    def get_row(self, post_id, document):
+        return (post_id, *(" ".join(document[f]) for f in FIELD_WEIGHTS))
+
+    def insert(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, text, comments) "
+            "VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+    def index(self, post):
+        document = get_documents([post])[post.pk]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", (post.pk,))
+            self.insert(cursor, [self.get_row(post.pk, document)])
+
+    @transaction.atomic(savepoint=False)
+    def update(self, post_id, removed, added):
+        """Убрать из записи поста термы removed и добавить термы added.
+
+        removed и added — термы части полей поста: {поле: [термы]}.
+        Остальные поля и комментарии заново не разбираются; новые термы
+        без удаляемых, например нового комментария, дописываются одним
+        запросом без чтения записи.
+        """
+        added = {field: terms for field, terms in added.items() if terms}
+        if not any(removed.values()):
+            if added:
+                self.append(post_id, added)
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT title, text, comments FROM {FTS_TABLE} "
+                "WHERE rowid = %s",
+                (post_id,),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return
+            document = dict(zip(FIELD_WEIGHTS, (v.split() for v in row)))
+            for field, terms in removed.items():
+                document[field] = remove_terms(document[field], terms)
+            for field, terms in added.items():
+                document[field].extend(terms)
+            cursor.execute(
+                f"UPDATE {FTS_TABLE} SET title = %s, text = %s, "
+                "comments = %s WHERE rowid = %s",
+                self.get_row(post_id, document)[1:] + (post_id,),
+            )
+
+    def append(self, post_id, added):
+        assignments = ", ".join(
+            f"{field} = {field} || ' ' || %s" for field in added)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {FTS_TABLE} SET {assignments} WHERE rowid = %s",
+                (*(" ".join(terms) for terms in added.values()), post_id),
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", (post_id,))
+
+    @transaction.atomic
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            rows = []
+            for post_id, document in iter_documents():
+                rows.append(self.get_row(post_id, document))
+                if len(rows) >= 500:
+                    self.insert(cursor, rows)
+                    rows = []
+            self.insert(cursor, rows)
+
+
+class InvertedIndexSearchBackend:
+    """Поиск по инвертированному индексу в таблице PostSearchTerm.
+
+    Запасной вариант для баз без FTS5: для каждого поста хранятся основы
+    слов с весом — числом вхождений в каждое поле, умноженным на вес
+    поля из FIELD_WEIGHTS. Все слова запроса должны встретиться в посте,
+    результаты ранжируются по сумме весов.
+    """
+
+    def matches(self, query):
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        return (
+            PostSearchTerm.objects.filter(term__in=terms)
+            .values("post")
+            .annotate(matched=Count("term"), score=Sum("weight"))
+            .filter(matched=len(terms))
+        )
+
+    def filter(self, queryset, query):
+        matches = self.matches(query)
+        if matches is None:
+            return queryset.none()
+        return queryset.filter(pk__in=matches.values("post"))
+
+    def search(self, queryset, query):
+        matches = self.matches(query)
+        if matches is None:
+            return queryset.none()
+        return queryset.filter(pk__in=matches.values("post")).annotate(
+            search_rank=Subquery(
+                matches.filter(post=OuterRef("pk")).values("score")),
+        ).order_by("-search_rank", *FEED_ORDERING)
+
+    def get_weights(self, document):
+        weights = Counter()
+        for field, terms in document.items():
+            for term in terms:
+                weights[term[:64]] += FIELD_WEIGHTS[field]
+        return weights
+
+    def get_terms(self, post_id, document):
+        return [
+            PostSearchTerm(post_id=post_id, term=term, weight=weight)
+            for term, weight in self.get_weights(document).items()
+        ]
+
+    @transaction.atomic
+    def index(self, post):
+        document = get_documents([post])[post.pk]
+        PostSearchTerm.objects.filter(post_id=post.pk).delete()
+        PostSearchTerm.objects.bulk_create(self.get_terms(post.pk, document))
+
+    @transaction.atomic(savepoint=False)
+    def update(self, post_id, removed, added):
+        """Вычесть веса термов removed и прибавить веса термов added.
+
+        removed и added — термы части полей поста: {поле: [термы]}.
+        Термы с нулевым весом удаляются из индекса.
+        """
+        deltas = self.get_weights(added)
+        deltas.subtract(self.get_weights(removed))
+        deltas = {term: delta for term, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        self.add_weights(post_id, deltas)
+        removed_terms = [term for term, delta in deltas.items() if delta < 0]
+        if removed_terms:
+            PostSearchTerm.objects.filter(
+                post_id=post_id, term__in=removed_terms, weight__lte=0,
+            ).delete()
+
+    def add_weights(self, post_id, deltas):
+        """Прибавить к весам термов поста deltas одним запросом (upsert)."""
+        table = PostSearchTerm._meta.db_table
+        values = ", ".join(["(%s, %s, %s)"] * len(deltas))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (post_id, term, weight) "
+                f"VALUES {values} ON CONFLICT (term, post_id) "
+                f"DO UPDATE SET weight = {table}.weight + excluded.weight",
+                [
+                    value
+                    for term, delta in deltas.items()
+                    for value in (post_id, term, delta)
+                ],
+            )
+
+    def remove(self, post_id):
+        PostSearchTerm.objects.filter(post_id=post_id).delete()
+
+    @transaction.atomic
+    def rebuild(self):
+        PostSearchTerm.objects.all().delete()
+        batch = []
+        for post_id, document in iter_documents():
+            batch.extend(self.get_terms(post_id, document))
+            if len(batch) >= 1000:
+                PostSearchTerm.objects.bulk_create(batch)
+                batch = []
+        PostSearchTerm.objects.bulk_create(batch)
+
+
+BACKENDS = {
+    "fts5": FTS5SearchBackend,
+    "inverted": InvertedIndexSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    """Есть ли в базе таблица FTS5, созданная миграцией."""
+    return (
+        connection.vendor == "sqlite"
+        and FTS_TABLE in connection.introspection.table_names()
+    )
+
+
+def get_search_backend():
+    """Вернуть поисковый бэкенд из POST_SEARCH_BACKEND.
+
+    По умолчанию используется FTS5, если он доступен, иначе —
+    инвертированный индекс.
+    """
+    name = settings.POST_SEARCH_BACKEND
+    if name is None:
+        name = "fts5" if fts5_available() else "inverted"
+    return BACKENDS[name]()
@@ -0,0 +1,146 @@
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache import invalidate_feeds
+from core.jobs import enqueue
+from core.stemmer import tokenize
+from .models import Category, Comment, Location, Post
+from .search import get_search_backend
+
+# Посты, которые сейчас удаляются: их комментарии удаляются каскадом, и
+# убирать термы каждого из записи поста незачем.
+deleted_posts = ContextVar("deleted_posts", default=frozenset())
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False,
+                            **kwargs):
+    """Увеличить счётчик комментариев поста при добавлении комментария.
+
+    При редактировании комментария у поста только обновляется updated_at.
+    При загрузке фикстуры счётчик приходит вместе с постом.
+    """
+    if raw:
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    if created:
+        posts.update(comment_count=F("comment_count") + 1)
+    else:
+        posts.update()
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшить счётчик комментариев поста при удалении комментария."""
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feed_caches(sender, **kwargs):
+    """Сбросить кэши лент при изменении поста, категории или места."""
+    invalidate_feeds()
+
+
+def get_index_changes(instance, fields):
+    """Вернуть термы изменившихся полей объекта: (старые, новые).
+
+    Старые значения берутся из indexed_values, новые запоминаются там
+    же. Если старое значение поля неизвестно, возвращается None.
+    """
+    indexed = getattr(instance, "indexed_values", {})
+    changed = [
+        name for name in fields
+        if indexed.get(name) != getattr(instance, name)
+    ]
+    if any(indexed.get(name) is None for name in changed):
+        changes = None
+    else:
+        changes = (
+            {name: tokenize(indexed[name]) for name in changed},
+            {name: tokenize(getattr(instance, name)) for name in changed},
+        )
+    instance.indexed_values = {
+        **indexed, **{name: getattr(instance, name) for name in fields}}
+    return changes
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    """Обновить запись поста в поисковом индексе.
+
+    Новый пост индексируется целиком. У изменённого в индексе заменяются
+    только термы заголовка и текста, если они изменились с загрузки
+    поста: остальные правки, например переключение is_published в списке
+    админки, индекс не трогают, а комментарии заново не разбираются.
+    """
+    fields = {"title", "text"}
+    if update_fields is not None:
+        fields &= set(update_fields)
+    if raw or not fields:
+        return
+    if created:
+        instance.indexed_values = {}
+    changes = get_index_changes(instance, fields)
+    if changes is None:
+        get_search_backend().index(instance)
+    elif changes[0]:
+        get_search_backend().update(instance.pk, *changes)
+
+
+@receiver(pre_delete, sender=Post)
+def start_post_delete(sender, instance, **kwargs):
+    """Запомнить удаляемый пост до каскадного удаления комментариев."""
+    deleted_posts.set(deleted_posts.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Убрать удалённый пост из поискового индекса."""
+    get_search_backend().remove(instance.pk)
+    deleted_posts.set(deleted_posts.get() - {instance.pk})
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, created, raw=False, **kwargs):
+    """Добавить в запись поста термы нового или изменённого комментария.
+
+    Разбирается только текст этого комментария, остальные комментарии
+    поста в индексе не пересчитываются.
+    """
+    if raw:
+        return
+    if created:
+        instance.indexed_values = {"text": ""}
+    changes = get_index_changes(instance, ("text",))
+    if changes is None:
+        enqueue("blog.tasks.index_post", instance.post_id)
+    elif changes[0]:
+        removed, added = changes
+        get_search_backend().update(
+            instance.post_id,
+            {"comments": removed["text"]},
+            {"comments": added["text"]},
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    """Убрать из записи поста термы удалённого комментария.
+
+    При удалении самого поста его запись удаляется целиком.
+    """
+    if instance.post_id in deleted_posts.get():
+        return
+    text = getattr(instance, "indexed_values", {}).get("text", instance.text)
+    get_search_backend().update(
+        instance.post_id, {"comments": tokenize(text)}, {})
@@ -0,0 +1,29 @@
+from core.images import build_image_variants
+from .models import Post
+from .search import get_search_backend
+
+
+def build_post_image_variants(post_id, image_name):
+    """Построить уменьшенные копии изображения поста.
+
+    Если пост удалён или изображение за это время заменили, задача
+    ничего не делает: для нового изображения поставлена своя задача.
+    """
+    post = Post.objects.filter(pk=post_id, image=image_name).only(
+        "pk", "image").first()
+    if post is None:
+        return
+    variants = build_image_variants(post.image)
+    Post.objects.filter(pk=post_id, image=image_name).update(
+        image_variants=variants)
+
+
+def index_post(post_id):
+    """Переиндексировать пост целиком.
+
+    Ставится, если прежний текст изменённого комментария неизвестен и
+    обновить запись поста по разнице термов нельзя.
+    """
+    post = Post.objects.filter(pk=post_id).only("pk", "title", "text").first()
+    if post is not None:
+        get_search_backend().index(post)
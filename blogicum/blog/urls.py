@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "blog"
 
@@ -23,12 +23,24 @@ urlpatterns = [
         views.UserPostsListView.as_view(),
         name="profile",
     ),
+    # Поиск по постам.
+    path(
+        "search/",
+        views.PostSearchView.as_view(),
+        name="search",
+    ),
     # Пост.
     path(
         "posts/<int:post_id>/",
         views.PostDetailView.as_view(),
         name="post_detail",
     ),
+    # Следующая порция комментариев к посту.
+    path(
+        "posts/<int:post_id>/comments/",
+        views.CommentListView.as_view(),
+        name="comments",
+    ),
     # Редактировать профиль пользователя.
     path(
         "edit_profile/",
@@ -72,3 +84,35 @@ urlpatterns = [
         name="delete_comment",
     ),
 ]
+
+# Под ASGI (см. blogicum.asgi_urls) читающие страницы обслуживают
+# асинхронные представления, остальные адреса те же.
+asgi_views = {
+    "index": async_views.index,
+    "category_posts": async_views.category_posts,
+    "profile": async_views.profile,
+    "post_detail": async_views.post_detail,
+}
+asgi_urlpatterns = [
+    path(str(pattern.pattern), asgi_views[pattern.name], name=pattern.name)
+    if pattern.name in asgi_views else pattern
+    for pattern in urlpatterns
+]
+
+# Бюджеты SQL-запросов на один запрос к URL; соблюдение проверяется тестами,
+# а в режиме DEBUG превышение пишется в лог QueryCountMiddleware.
+query_budgets = {
+    "index": 6,
+    "category_posts": 7,
+    "profile": 6,
+    "search": 5,
+    "post_detail": 6,
+    "comments": 5,
+    "edit_profile": 2,
+    "create_post": 4,
+    "edit_post": 7,
+    "delete_post": 6,
+    "add_comment": 11,
+    "edit_comment": 11,
+    "delete_comment": 12,
+}
@@ -1,8 +1,11 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.utils.timezone import now
 from django.views.generic import (
     DetailView,
     UpdateView,
@@ -10,9 +13,26 @@ from django.views.generic import (
     DeleteView,
 )
 
-from core.utils import post_all_query, post_published_query, get_post_data
-from core.mixins import CommentMixinView
+from core.db import replica_reads
+from core.utils import (
+    COMMENT_ORDERING,
+    annotate_visibility,
+    category_state,
+    get_cursor_page,
+    get_post_data,
+    post_all_query,
+    post_published_query,
+    profile_state,
+    publish_due_posts,
+)
+from core.mixins import (
+    CommentMixinView,
+    ConditionalGetMixin,
+    FeedPageCacheMixin,
+)
 from .models import Post, User, Category, Comment
+from .notifications import queue_comment_notification
+from .search import get_search_backend
 from .forms import UserEditForm, PostEditForm, CommentEditForm
 from django.utils import timezone
 
@@ -22,31 +42,61 @@ from django.shortcuts import render
 from core.utils import get_page
 
 
-class MainPostListView(View):
-    """Главная страница со списком постов с ручной пагинацией."""
+@replica_reads
+class MainPostListView(FeedPageCacheMixin, ConditionalGetMixin, View):
+    """Главная страница со списком постов с ручной пагинацией.
+
+    Страницы для анонимных пользователей отдаются из кэша.
+    """
 
     template_name = "blog/index.html"
     paginate_by = 10
+    feed_cache_name = "index"
+
+    def get_validator_queryset(self):
+        return post_published_query()
+
+    def get_validator_feed(self):
+        return "index"
 
     def get(self, request, *args, **kwargs):
         queryset = post_published_query()
-        page_obj = get_page(request, queryset, self.paginate_by)
+        page_obj = get_page(
+            request, queryset, self.paginate_by, feed="index")
         return render(request, self.template_name, {"page_obj": page_obj})
 
 
-class CategoryPostListView(View):
+@replica_reads
+class CategoryPostListView(ConditionalGetMixin, View):
     template_name = "blog/category.html"
     paginate_by = 10
+    # Категории боковой панели страницы категории.
+    sidebar_slugs = ("news", "science", "travel")
 
-    def get(self, request, *args, **kwargs):
-        category = get_object_or_404(
+    def get_validator_queryset(self):
+        return post_published_query().filter(
+            category__slug=self.kwargs["category_slug"])
+
+    def get_validator_state(self):
+        self.category = get_object_or_404(
             Category, slug=self.kwargs["category_slug"], is_published=True
         )
+        self.sidebar = list(
+            Category.objects.filter(slug__in=self.sidebar_slugs))
+        return category_state(self.category, self.sidebar)
+
+    def get_validator_feed(self):
+        return f"category:{self.category.slug}"
+
+    def get(self, request, *args, **kwargs):
+        category = self.category
         queryset = post_published_query().filter(category=category)
-        page_obj = get_page(request, queryset, self.paginate_by)
-        extra_categories = Category.objects.filter(
-            slug__in=["news", "science", "travel"], is_published=True
+        page_obj = get_page(
+            request, queryset, self.paginate_by,
+            feed=f"category:{category.slug}",
         )
+        extra_categories = [
+            item for item in self.sidebar if item.is_published]
         return render(
             request,
             self.template_name,
@@ -58,53 +108,135 @@ class CategoryPostListView(View):
         )
 
 
-class UserPostsListView(View):
+@replica_reads
+class UserPostsListView(ConditionalGetMixin, View):
     template_name = "blog/profile.html"
     paginate_by = 10
 
+    def get_validator_queryset(self):
+        username = self.kwargs["username"]
+        if self.request.user.get_username() == username:
+            return Post.objects.filter(author__username=username)
+        return post_published_query().filter(author__username=username)
+
+    def get_validator_state(self):
+        self.author = get_object_or_404(User, username=self.kwargs["username"])
+        return profile_state(self.author)
+
+    def get_validator_feed(self):
+        if self.author == self.request.user:
+            return f"author:{self.author.pk}:all"
+        return f"author:{self.author.pk}"
+
     def get(self, request, *args, **kwargs):
-        author = get_object_or_404(User, username=self.kwargs["username"])
+        author = self.author
         if author == request.user:
             queryset = post_all_query().filter(author=author)
+            feed = f"author:{author.pk}:all"
         else:
             queryset = post_published_query().filter(author=author)
-        page_obj = get_page(request, queryset, self.paginate_by)
+            feed = f"author:{author.pk}"
+        page_obj = get_page(request, queryset, self.paginate_by, feed=feed)
         return render(
             request, self.template_name,
             {"page_obj": page_obj, "profile": author}
         )
 
 
-class PostDetailView(DetailView):
+@replica_reads
+class PostSearchView(View):
+    """Поиск по опубликованным постам.
+
+    Результаты ранжируются поисковым бэкендом (см. blog.search) и
+    подчиняются тем же правилам видимости, что и ленты.
+    """
+
+    template_name = "blog/search.html"
+    paginate_by = 10
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "").strip()
+        results = get_search_backend().search(post_published_query(), query)
+        page_obj = Paginator(results, self.paginate_by).get_page(
+            request.GET.get("page"))
+        return render(
+            request,
+            self.template_name,
+            {
+                "page_obj": page_obj,
+                "query": query,
+                "page_params": urlencode({"q": query}) + "&",
+            },
+        )
+
+
+class PostVisibilityMixin:
+    """Mixin загрузки поста с признаком видимости.
+
+    Пост со связанными объектами и признаком видимости читателям
+    загружается одним запросом. Скрытый пост доступен только автору.
+
+    Атрибуты:
+        - comments_paginate_by: Количество комментариев в одной порции.
+    """
+
     model = Post
-    template_name = "blog/detail.html"
-    post_data = None
     pk_url_kwarg = "post_id"
+    comments_paginate_by = 20
 
     def get_queryset(self):
-        self.post_data = get_object_or_404(Post, pk=self.kwargs["post_id"])
-        if self.post_data.author == self.request.user:
-            return post_all_query().filter(pk=self.kwargs["post_id"])
-        return post_published_query().filter(pk=self.kwargs["post_id"])
+        publish_due_posts()
+        return annotate_visibility(post_all_query())
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if not post.is_visible and post.author_id != self.request.user.pk:
+            raise Http404
+        return post
+
+    def get_comments_page(self, cursor=None):
+        """Вернуть порцию комментариев поста, начиная с курсора."""
+        return get_cursor_page(
+            self.object.comments.select_related("author"),
+            cursor,
+            self.comments_paginate_by,
+            ordering=COMMENT_ORDERING,
+        )
+
+
+@replica_reads
+class PostDetailView(ConditionalGetMixin, PostVisibilityMixin, DetailView):
+    """Страница поста с первой порцией комментариев."""
+
+    template_name = "blog/detail.html"
+
+    def get_validator_queryset(self):
+        return Post.objects.filter(pk=self.kwargs["post_id"])
+
+    def get_validator_feed(self):
+        return f"post:{self.kwargs['post_id']}"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.check_post_data():
+        if self.object.is_visible:
             context["flag"] = True
             context["form"] = CommentEditForm()
-        context["comments"] =\
-            self.object.comments.all().select_related("author")
+        context["comments"] = self.get_comments_page()
         return context
 
-    def check_post_data(self):
-        """Вернуть результат проверки поста."""
-        return all(
-            (
-                self.post_data.is_published,
-                self.post_data.pub_date <= now(),
-                self.post_data.category.is_published,
-            )
-        )
+
+@replica_reads
+class CommentListView(PostVisibilityMixin, DetailView):
+    """Следующая порция комментариев поста для кнопки «Показать ещё»."""
+
+    template_name = "includes/comment_list.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["flag"] = self.object.is_visible
+        context["comments"] = self.get_comments_page(
+            self.request.GET.get("cursor"))
+        return context
 
 
 class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -242,11 +374,13 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     Методы:
         - dispatch(request, *args, **kwargs): Получает объект поста.
         - form_valid(form): Проверяет, является ли форма допустимой,
-        и устанавливает автора комментария.
+        и устанавливает автора комментария; комментарий и счётчик
+        комментариев поста сохраняются в одной транзакции.
         - get_success_url(): Возвращает URL-адрес перенаправления после
         успешного создания комментария.
-        - send_author_email(): Отправляет email автору поста, при добавлении
-        комментария.
+        - send_author_email(): Ставит в очередь email автору поста
+        о добавленном комментарии; письма отправляет команда
+        send_comment_notifications.
     """
 
     model = Comment
@@ -258,12 +392,14 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         self.post_data = get_post_data(self.kwargs)
         return super().dispatch(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = self.post_data
+        response = super().form_valid(form)
         if self.post_data.author != self.request.user:
             self.send_author_email()
-        return super().form_valid(form)
+        return response
 
     def get_success_url(self):
         post_id = self.kwargs["post_id"]
@@ -271,20 +407,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
     def send_author_email(self):
         post_url = self.request.build_absolute_uri(self.get_success_url())
-        recipient_email = self.post_data.author.email
-        subject = "New comment"
-        message = (
-            f"Пользователь {self.request.user} добавил "
-            f"комментарий к посту {self.post_data.title}.\n"
-            f"Читать комментарий {post_url}"
-        )
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email="from@example.com",
-            recipient_list=[recipient_email],
-            fail_silently=True,
-        )
+        queue_comment_notification(self.object, post_url)
 
 
 class CommentUpdateView(CommentMixinView, UpdateView):
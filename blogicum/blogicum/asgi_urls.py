@@ -0,0 +1,20 @@
+"""Адреса для ASGI: те же, что в blogicum.urls, но читающие страницы
+блога обслуживают асинхронные представления blog.async_views.
+
+Подключаются через ASGI_URLCONF (см. core.middleware.AsgiUrlconfMiddleware).
+"""
+from django.urls import include, path
+
+from blog.urls import asgi_urlpatterns
+from . import urls
+
+handler404 = urls.handler404
+handler500 = urls.handler500
+
+urlpatterns = [
+    path("", include((asgi_urlpatterns, "blog"), namespace="blog")),
+    *(
+        pattern for pattern in urls.urlpatterns
+        if getattr(pattern, "namespace", None) != "blog"
+    ),
+]
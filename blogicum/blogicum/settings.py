@@ -32,6 +32,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryCountMiddleware",
+    "core.middleware.CompressionMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
+    "core.middleware.AsgiUrlconfMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -41,6 +45,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Записывать SQL-запросы каждого запроса в request.query_stats и без
+# DEBUG (core.middleware.QueryCountMiddleware); включается в тестах
+# бюджетов запросов. В DEBUG запросы записываются всегда.
+QUERY_STATS = False
+
 ROOT_URLCONF = "blogicum.urls"
 
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -49,8 +58,19 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Шаблоны разбираются один раз на процесс, а подключаемые
+            # через include встраиваются в них при загрузке (см.
+            # core.loaders). При разработке runserver сбрасывает кэш
+            # загрузчиков, когда шаблон меняется.
+            "loaders": [
+                ("django.template.loaders.cached.Loader", [
+                    ("core.loaders.InlineIncludeLoader", [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ]),
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -68,11 +88,98 @@ WSGI_APPLICATION = "blogicum.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
 
+# Профили соединений SQLite для бэкенда core.backends.sqlite3: PRAGMA,
+# выполняемые на каждом новом соединении, и режим BEGIN для atomic().
+# В «production» журнал WAL позволяет читателям не блокировать писателя,
+# транзакции сразу берут блокировку на запись, а при занятой базе
+# соединение до busy_timeout мс ждёт её вместо ошибки
+# «database is locked». Сравнить профили: manage.py bench_sqlite.
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "transaction_mode": "IMMEDIATE",
+        "pragmas": {
+            "busy_timeout": 5000,
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,  # В КиБ: 64 МиБ.
+            "temp_store": "MEMORY",
+        },
+    },
+}
+SQLITE_PROFILE = "production"
+
+# Реплики для чтения: псевдонимы из DATABASES, в которые уходят чтения
+# представлений, помеченных core.db.replica_reads. Для проверки на двух
+# файлах SQLite добавьте реплику и копируйте в неё основную базу
+# командой sync_replica:
+#
+# DATABASES["replica"] = {
+#     "ENGINE": "core.backends.sqlite3",
+#     "NAME": BASE_DIR / "replica.sqlite3",
+#     "TEST": {"MIRROR": "default"},
+# }
+# DATABASE_REPLICAS = ["replica"]
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ["core.db.ReplicaRouter"]
+
+# Сколько секунд после изменения данных клиент читает из основной базы,
+# чтобы видеть свои изменения до того, как их получит реплика.
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = "read_primary"
+
+CACHES = {
+    # Кэш лент: версия данных, числа постов и страницы для анонимов.
+    # Он должен быть общим для всех процессов сервера, иначе изменение
+    # поста в одном воркере не сбросит кэши лент в остальных. Файловый
+    # кэш общий для процессов одной машины; если серверов несколько,
+    # замените его на Memcached или Redis. У файлового кэша incr() —
+    # это чтение и запись без блокировки: если два процесса сбрасывают
+    # версию лент одновременно, оба запишут одно значение, и кэш,
+    # заполненный между сбросами, может устареть на время жизни записей
+    # (FEED_COUNT_CACHE_TIMEOUT, FEED_PAGE_CACHE_TIMEOUT). У Memcached и
+    # Redis incr() атомарен.
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Кэш фрагментов шаблонов ({% cache %}), например карточек постов:
+    # ключи версионированы, поэтому записи живут, пока их не вытеснят.
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template-fragments",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# Время жизни закэшированного числа постов в ленте, в секундах.
+FEED_COUNT_CACHE_TIMEOUT = 5 * 60
+
+# Время жизни отрендеренной страницы ленты для анонимов, в секундах.
+FEED_PAGE_CACHE_TIMEOUT = 60
+
+# Сжатие ответов (core.middleware.CompressionMiddleware): уровень gzip
+# (1–9), качество brotli (0–11; используется, если установлен пакет
+# brotli) и минимальный размер сжимаемого ответа в байтах.
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_MIN_SIZE = 200
+
+# Под ASGI адреса берутся из ASGI_URLCONF: читающие страницы блога там
+# обслуживают асинхронные представления (blog.async_views). Их запросы
+# к базе выполняются в пуле из ASYNC_DB_WORKERS потоков; у каждого потока
+# своё соединение, поэтому это и предел одновременных соединений с базой.
+ASGI_URLCONF = "blogicum.asgi_urls"
+ASYNC_DB_WORKERS = 4
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -104,16 +211,73 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Каталог, в который collectstatic собирает статику для production.
+STATIC_ROOT = BASE_DIR / "collected_static"
+
+# В production (DEBUG = False) имена файлов статики содержат хеш
+# содержимого, а рядом лежат сжатые копии .gz/.br (см. core.storage);
+# отдаёт их core.static.serve.
+if not DEBUG:
+    STATICFILES_STORAGE = "core.storage.CompressedManifestStaticFilesStorage"
+
+# Время кэширования статики браузером, в секундах: файлы с хешем в имени
+# не меняются и кэшируются на год, остальные — на час.
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+STATIC_MAX_AGE = 60 * 60
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / "media"
 
-EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+# Ширины уменьшенных копий изображений постов, в пикселях.
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+# Качество сжатия уменьшенных копий (JPEG и WebP).
+POST_IMAGE_QUALITY = 80
+
+# Поиск по постам: "fts5" (SQLite FTS5), "inverted" (инвертированный
+# индекс в таблице PostSearchTerm) или None — FTS5, если он доступен.
+POST_SEARCH_BACKEND = None
+
+# Фоновые задачи (core.Job): число попыток, начальная пауза перед
+# повтором и время, после которого зависшую задачу можно взять снова,
+# в секундах.
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_DELAY = 30
+
+JOB_LOCK_TIMEOUT = 10 * 60
+
+# Письма дописываются пачками в файлы mbox в EMAIL_FILE_PATH; для
+# отправки через SMTP с пулом соединений укажите
+# "core.mail.PooledSMTPEmailBackend".
+EMAIL_BACKEND = "core.mail.MboxEmailBackend"
 
 EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 
+# Сколько писем MboxEmailBackend копит в памяти до записи в файл и
+# наибольший размер файла mbox, после которого начинается новый.
+EMAIL_MBOX_BATCH_SIZE = 100
+
+EMAIL_MBOX_MAX_BYTES = 10 * 1024 * 1024
+
+# Пул PooledSMTPEmailBackend: число свободных соединений на сервер и
+# сколько секунд соединение может простаивать.
+EMAIL_POOL_SIZE = 4
+
+EMAIL_POOL_MAX_IDLE = 60
+
+# Уведомления о комментариях: сколько секунд копить комментарии к посту
+# в один дайджест, число попыток отправки и начальная пауза перед
+# повтором, в секундах.
+COMMENT_DIGEST_WINDOW = 5 * 60
+
+NOTIFICATION_MAX_ATTEMPTS = 5
+
+NOTIFICATION_RETRY_DELAY = 60
+
 LOGIN_REDIRECT_URL = "blog:index"
 
 LOGIN_URL = "login"
@@ -1,10 +1,12 @@
 from django.contrib import admin
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 from django.contrib.auth.forms import UserCreationForm
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.static import serve as serve_static
+
 handler404 = "pages.views.page_not_found"
 handler500 = "pages.views.server_error"
 
@@ -22,6 +24,13 @@ urlpatterns = [
         ),
         name="registration",
     ),
+    # Статика из STATIC_ROOT со сжатыми копиями; при DEBUG runserver
+    # отдаёт статику сам, не доходя до этого маршрута.
+    re_path(
+        r"^{}(?P<path>.+)$".format(settings.STATIC_URL.lstrip("/")),
+        serve_static,
+        name="static",
+    ),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Интерфейс для фоновых задач."""
+
+    list_display = (
+        "task",
+        "status",
+        "attempts",
+        "run_after",
+        "created_at",
+    )
+    list_filter = ("status", "task")
+    readonly_fields = (
+        "task",
+        "args",
+        "kwargs",
+        "attempts",
+        "locked_at",
+        "last_error",
+        "created_at",
+    )
@@ -0,0 +1,27 @@
+from django.db.backends.sqlite3 import base
+
+from core.db import apply_sqlite_pragmas, get_sqlite_profile
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Бэкенд SQLite с настройкой соединений по профилю SQLITE_PROFILE.
+
+    На каждом новом соединении выполняются PRAGMA профиля, а транзакции
+    atomic() открываются в его режиме transaction_mode. В режиме
+    IMMEDIATE транзакция сразу берёт блокировку на запись и при занятой
+    базе ждёт её до busy_timeout; с отложенным BEGIN транзакция, которая
+    сначала читает, а потом пишет, получает «database is locked» без
+    ожидания, если другой процесс успел записать раньше.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = get_sqlite_profile()
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_sqlite_pragmas(connection, self.profile["pragmas"])
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.profile['transaction_mode']}")
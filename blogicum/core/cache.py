@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+FEED_VERSION_KEY = "feed:version"
+
+
+def get_feed_version():
+    """Вернуть текущую версию данных лент.
+
+    Версия входит в ключи всех кэшей лент, поэтому её смена разом
+    делает их неактуальными. Начальное значение берётся из времени,
+    чтобы после вытеснения ключа не вернуться к старой версии.
+    """
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def invalidate_feeds():
+    """Сбросить кэши всех лент после изменения постов или категорий."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        get_feed_version()
+
+
+def feed_cache_key(prefix, feed):
+    """Вернуть ключ кэша ленты feed для текущей версии данных."""
+    return f"{prefix}:{get_feed_version()}:{feed}"
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт общее число записей ленты из кэша.
+
+    Атрибуты:
+        - feed: Имя ленты для ключа кэша; без него кэш не используется.
+    """
+
+    def __init__(self, object_list, per_page, feed=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return super().count
+        key = feed_cache_key("feed-count", self.feed)
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.FEED_COUNT_CACHE_TIMEOUT)
+        return count
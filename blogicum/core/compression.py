@@ -0,0 +1,63 @@
+import gzip
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен: только gzip
+    brotli = None
+
+
+def get_accepted_encodings(request):
+    """Вернуть кодировки из Accept-Encoding, кроме запрещённых q=0."""
+    accepted = set()
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request):
+    """Выбрать сжатие для ответа: br, если доступен, затем gzip."""
+    accepted = get_accepted_encodings(request)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress_bytes(data, encoding):
+    """Сжать data целиком."""
+    if encoding == "br":
+        return brotli.compress(
+            data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(
+        data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимать поток по частям, отдавая каждую часть сразу.
+
+    После каждой части сжатые данные сбрасываются, поэтому клиент
+    получает их, не дожидаясь конца потока.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    # wbits 31 — формат gzip (с заголовком и контрольной суммой).
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
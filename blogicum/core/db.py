@@ -0,0 +1,133 @@
+import asyncio
+import contextvars
+import functools
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Порядок важен: busy_timeout задаётся до journal_mode, которому может
+# понадобиться дождаться блокировки базы.
+PRAGMA_ORDER = ("busy_timeout", "journal_mode")
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+_db_executor = None
+_db_executor_lock = threading.Lock()
+
+
+def replica_reads(view):
+    """Разрешить представлению читать данные из реплик.
+
+    Подходит для классов и функций представлений; сами чтения
+    переключает ReplicaRoutingMiddleware.
+    """
+    view.use_replica = True
+    return view
+
+
+@contextmanager
+def reading_from_replicas():
+    """Направлять чтения внутри блока в реплики из DATABASE_REPLICAS."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def get_db_executor():
+    """Вернуть пул потоков для работы с базой из асинхронного кода.
+
+    Пул создаётся при первом обращении, его размер задаёт
+    ASYNC_DB_WORKERS. У каждого потока пула свои соединения с базой,
+    которые живут вместе с ним, поэтому размер пула ограничивает и число
+    одновременно открытых соединений.
+    """
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_WORKERS,
+                thread_name_prefix="db",
+            )
+    return _db_executor
+
+
+async def run_db(func, *args, **kwargs):
+    """Выполнить синхронную функцию func в пуле get_db_executor().
+
+    Функция работает в копии контекста вызывающего кода: в ней действуют
+    reading_from_replicas() и учёт запросов QueryRecorder. Независимые
+    вызовы run_db можно ждать вместе через asyncio.gather().
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_db_executor(),
+        functools.partial(context.run, func, *args, **kwargs),
+    )
+
+
+class ReplicaRouter:
+    """Маршрутизатор чтений в реплики базы данных.
+
+    Чтения уходят в случайную реплику из DATABASE_REPLICAS только внутри
+    reading_from_replicas(); все записи и остальные чтения идут в
+    основную базу. На репликах миграции не выполняются — их содержимое
+    приходит репликацией (локально — командой sync_replica).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def get_sqlite_profile(name=None):
+    """Вернуть профиль SQLite из SQLITE_PROFILES.
+
+    По умолчанию берётся профиль SQLITE_PROFILE. PRAGMA профиля
+    возвращаются списком пар в порядке выполнения.
+    """
+    profile = settings.SQLITE_PROFILES[name or settings.SQLITE_PROFILE]
+    pragmas = sorted(
+        profile.get("pragmas", {}).items(),
+        key=lambda item: (
+            PRAGMA_ORDER.index(item[0])
+            if item[0] in PRAGMA_ORDER else len(PRAGMA_ORDER)
+        ),
+    )
+    return {
+        "transaction_mode": profile.get("transaction_mode", "DEFERRED"),
+        "pragmas": pragmas,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Выполнить PRAGMA на соединении sqlite3.
+
+    Запросы идут мимо курсоров Django, поэтому не попадают в учёт
+    запросов страницы.
+    """
+    for name, value in pragmas:
+        dbapi_connection.execute(f"PRAGMA {name} = {value}").fetchall()
@@ -0,0 +1,73 @@
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+# Формат Pillow, расширение файла и параметры сохранения для каждого
+# варианта изображения.
+VARIANT_FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"optimize": True, "progressive": True}),
+    "webp": ("WEBP", "webp", {"method": 6}),
+}
+
+
+def get_variant_formats():
+    """Вернуть форматы вариантов, которые поддерживает установленный Pillow."""
+    formats = ["jpeg"]
+    if features.check("webp"):
+        formats.append("webp")
+    return formats
+
+
+def get_variant_widths(width, widths):
+    """Вернуть ширины вариантов, не превышающие ширину оригинала.
+
+    Если оригинал уже нескольких ширин, он всё равно пережимается в одну
+    копию исходного размера.
+    """
+    fitting = sorted(w for w in widths if w < width)
+    return [*fitting, width] if len(fitting) < len(widths) else fitting
+
+
+def build_image_variants(field_file, widths=None, quality=None):
+    """Создать уменьшенные и пережатые копии изображения.
+
+    Копии сохраняются в то же хранилище, в подкаталог variants рядом
+    с оригиналом.
+
+    Возвращает словарь {формат: [{"width", "height", "name"}, ...]},
+    в котором варианты отсортированы по возрастанию ширины.
+    """
+    widths = widths or settings.POST_IMAGE_WIDTHS
+    quality = quality or settings.POST_IMAGE_QUALITY
+    storage = field_file.storage
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as source:
+            image = ImageOps.exif_transpose(source).convert("RGB")
+    finally:
+        field_file.close()
+
+    variants = {fmt: [] for fmt in get_variant_formats()}
+    for width in get_variant_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = (
+            image if width == image.width
+            else image.resize((width, height), Image.Resampling.LANCZOS)
+        )
+        for fmt, items in variants.items():
+            pil_format, extension, options = VARIANT_FORMATS[fmt]
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=quality, **options)
+            name = storage.save(
+                posixpath.join(
+                    directory, "variants", f"{stem}-{width}w.{extension}"),
+                ContentFile(buffer.getvalue()),
+            )
+            items.append({"width": width, "height": height, "name": name})
+    return variants
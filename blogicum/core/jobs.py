@@ -0,0 +1,111 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+
+def enqueue(task, *args, run_after=None, **kwargs):
+    """Поставить задачу в очередь.
+
+    Запись создаётся в текущей транзакции, поэтому обработчик увидит
+    задачу только вместе с данными, ради которых она поставлена.
+    """
+    return Job.objects.create(
+        task=task,
+        args=list(args),
+        kwargs=kwargs,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def claim_jobs(limit):
+    """Взять в работу до limit очередных задач.
+
+    Задача считается взятой, только если условный UPDATE изменил её
+    строку, поэтому несколько обработчиков не выполнят одну задачу дважды.
+    Задачи, зависшие в работе дольше JOB_LOCK_TIMEOUT, берутся повторно.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    ready = (
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    )
+    claimed = []
+    for job in Job.objects.filter(ready)[:limit]:
+        updated = Job.objects.filter(
+            pk=job.pk, status=job.status, locked_at=job.locked_at,
+        ).update(status=Job.RUNNING, locked_at=now)
+        if updated:
+            job.status, job.locked_at = Job.RUNNING, now
+            claimed.append(job)
+    return claimed
+
+
+def execute_job(task, args, kwargs):
+    """Выполнить функцию задачи."""
+    return import_string(task)(*args, **kwargs)
+
+
+def execute_job_in_worker(task, args, kwargs):
+    """Выполнить функцию задачи в процессе пула обработчиков."""
+    close_old_connections()
+    return execute_job(task, args, kwargs)
+
+
+def finish_job(job, error=None):
+    """Записать результат задачи.
+
+    Неудачная задача возвращается в очередь с экспоненциальной паузой,
+    пока не исчерпано JOB_MAX_ATTEMPTS попыток.
+    """
+    job.attempts += 1
+    job.locked_at = None
+    if error is None:
+        job.status = Job.DONE
+        job.last_error = ""
+    else:
+        job.last_error = "".join(traceback.format_exception(
+            type(error), error, error.__traceback__))
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.FAILED
+    job.save(update_fields=(
+        "attempts", "locked_at", "status", "last_error", "run_after"))
+
+
+def run_jobs(limit=10, executor=None):
+    """Выполнить очередную порцию задач и вернуть их число.
+
+    С executor (например, ProcessPoolExecutor) функции задач выполняются
+    в нём параллельно, а состояние задач записывает текущий процесс;
+    без него задачи выполняются по очереди в текущем процессе.
+    """
+    jobs = claim_jobs(limit)
+    if executor is None:
+        for job in jobs:
+            try:
+                execute_job(job.task, job.args, job.kwargs)
+            except Exception as error:
+                finish_job(job, error)
+            else:
+                finish_job(job)
+        return len(jobs)
+
+    futures = [
+        (job, executor.submit(
+            execute_job_in_worker, job.task, job.args, job.kwargs))
+        for job in jobs
+    ]
+    for job, future in futures:
+        finish_job(job, future.exception())
+    return len(jobs)
@@ -0,0 +1,82 @@
+import re
+
+from django.template import Origin, TemplateDoesNotExist
+from django.template.loaders.base import Loader as BaseLoader
+
+INCLUDE_RE = re.compile(
+    r"""{%\s*include\s+(["'])(?P<name>[^"']+)\1"""
+    r"""(?:\s+with\s+(?P<extra>.*?))?\s*%}"""
+)
+# Шаблоны с наследованием или с тегами, записывающими переменные в
+# контекст ({% url ... as name %} и т. п.), встраивать нельзя: include
+# изолирует такие переменные, а встроенный текст — нет.
+NOT_INLINABLE_RE = re.compile(
+    r"{%\s*(?:extends|block)\b|{%[^%]*\sas\s+\w+\s*%}")
+
+
+class InlineIncludeLoader(BaseLoader):
+    """Загрузчик, встраивающий подключаемые шаблоны в текст шаблона.
+
+    Теги {% include %} с именем шаблона в кавычках заменяются текстом
+    этого шаблона (с аргументами with — внутри {% with %}), поэтому
+    карточка поста в ленте разбирается вместе со страницей и при
+    отрисовке не загружает и не выполняет вложенные шаблоны. Include с
+    only, с именем из переменной или на неподходящий для встраивания
+    шаблон остаются как есть.
+
+    Атрибуты:
+        - loaders: Загрузчики, из которых берутся исходные шаблоны.
+    """
+
+    def __init__(self, engine, loaders):
+        self.loaders = engine.get_template_loaders(loaders)
+        super().__init__(engine)
+
+    def get_dirs(self):
+        for loader in self.loaders:
+            if hasattr(loader, "get_dirs"):
+                yield from loader.get_dirs()
+
+    def get_template_sources(self, template_name):
+        # Источник привязывается к этому загрузчику, иначе обёртка вроде
+        # cached.Loader прочитает его напрямую, минуя встраивание.
+        for loader in self.loaders:
+            for source in loader.get_template_sources(template_name):
+                origin = Origin(source.name, source.template_name, self)
+                origin.source = source
+                yield origin
+
+    def get_contents(self, origin):
+        contents = origin.source.loader.get_contents(origin.source)
+        return self.inline(contents, {origin.template_name})
+
+    def get_source(self, template_name):
+        """Вернуть исходный текст шаблона или None, если его нет."""
+        for loader in self.loaders:
+            for origin in loader.get_template_sources(template_name):
+                try:
+                    return loader.get_contents(origin)
+                except TemplateDoesNotExist:
+                    continue
+        return None
+
+    def inline(self, contents, parents):
+        """Встроить подключаемые шаблоны в contents рекурсивно.
+
+        parents — имена шаблонов по цепочке подключения, чтобы не
+        зациклиться на рекурсивном include.
+        """
+
+        def replace(match):
+            name, extra = match["name"], match["extra"]
+            if name in parents or (extra and re.search(r"\bonly$", extra)):
+                return match[0]
+            source = self.get_source(name)
+            if source is None or NOT_INLINABLE_RE.search(source):
+                return match[0]
+            source = self.inline(source, parents | {name})
+            if extra:
+                return f"{{% with {extra} %}}{source}{{% endwith %}}"
+            return source
+
+        return INCLUDE_RE.sub(replace, contents)
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from email.generator import BytesGenerator
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class MboxEmailBackend(BaseEmailBackend):
+    """Бэкенд, дописывающий письма пачками в файлы формата mbox.
+
+    В отличие от файлового бэкенда Django письма не создают по файлу на
+    каждое соединение: пока соединение открыто, они копятся в памяти и
+    дописываются одной записью при закрытии соединения или по достижении
+    EMAIL_MBOX_BATCH_SIZE писем. Файл за день ротируется, когда его размер
+    превышает EMAIL_MBOX_MAX_BYTES.
+
+    Атрибуты:
+        - file_path: Каталог для файлов, по умолчанию EMAIL_FILE_PATH.
+    """
+
+    def __init__(self, *args, file_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_path = os.path.abspath(
+            file_path or getattr(settings, "EMAIL_FILE_PATH", None))
+        try:
+            os.makedirs(self.file_path, exist_ok=True)
+        except OSError as error:
+            raise ImproperlyConfigured(
+                "Не удалось создать каталог для писем: "
+                f"{self.file_path} ({error})"
+            )
+        self.buffer = None
+
+    def open(self):
+        if self.buffer is None:
+            self.buffer = []
+            return True
+        return False
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.buffer = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        new_conn_created = self.open()
+        try:
+            for message in email_messages:
+                self.buffer.append(self.format_message(message))
+            if len(self.buffer) >= settings.EMAIL_MBOX_BATCH_SIZE:
+                self.flush()
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        finally:
+            if new_conn_created:
+                self.close()
+        return len(email_messages)
+
+    def format_message(self, message):
+        """Вернуть письмо в виде записи mbox."""
+        data = BytesIO()
+        data.write(f"From MAILER-DAEMON {time.asctime()}\n".encode())
+        # mangle_from_ экранирует строки «From » в теле, чтобы они не
+        # считались началом следующего письма.
+        BytesGenerator(data, mangle_from_=True).flatten(
+            message.message(), linesep="\n")
+        data.write(b"\n\n")
+        return data.getvalue()
+
+    def flush(self):
+        """Дописать накопленные письма в текущий файл одной записью."""
+        if not self.buffer:
+            return
+        data = b"".join(self.buffer)
+        fd = os.open(
+            self.get_filename(len(data)),
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o644,
+        )
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        self.buffer.clear()
+
+    def get_filename(self, size):
+        """Вернуть файл за сегодня, в который поместится ещё size байт."""
+        prefix = datetime.now().strftime("%Y%m%d")
+        index = 0
+        while True:
+            filename = os.path.join(self.file_path, f"{prefix}-{index}.mbox")
+            try:
+                current = os.path.getsize(filename)
+            except FileNotFoundError:
+                return filename
+            if current + size <= settings.EMAIL_MBOX_MAX_BYTES:
+                return filename
+            index += 1
+
+
+class SMTPConnectionPool:
+    """Пул открытых SMTP-соединений процесса.
+
+    Соединения группируются по параметрам сервера; простаивавшие дольше
+    EMAIL_POOL_MAX_IDLE секунд закрываются.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = defaultdict(deque)
+
+    def acquire(self, key):
+        """Вернуть живое свободное соединение или None."""
+        while True:
+            with self.lock:
+                if not self.idle[key]:
+                    return None
+                connection, released_at = self.idle[key].pop()
+            if time.monotonic() - released_at > settings.EMAIL_POOL_MAX_IDLE:
+                self.discard(connection)
+                continue
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except Exception:
+                pass
+            self.discard(connection)
+
+    def release(self, key, connection):
+        """Вернуть соединение в пул; лишнее соединение закрывается."""
+        with self.lock:
+            if len(self.idle[key]) < settings.EMAIL_POOL_SIZE:
+                self.idle[key].append((connection, time.monotonic()))
+                return
+        self.discard(connection)
+
+    def discard(self, connection):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def clear(self):
+        """Закрыть все свободные соединения."""
+        with self.lock:
+            idle, self.idle = self.idle, defaultdict(deque)
+        for connections in idle.values():
+            for connection, _ in connections:
+                self.discard(connection)
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+class PooledSMTPEmailBackend(SMTPEmailBackend):
+    """SMTP-бэкенд, переиспользующий соединения между вызовами.
+
+    Закрытие соединения возвращает его в пул процесса, поэтому отправка
+    следующего письма обходится без нового TLS-рукопожатия и авторизации.
+    Соединение, на котором отправка не удалась, в пул не возвращается.
+    """
+
+    @property
+    def pool_key(self):
+        return (
+            self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        connection = smtp_pool.acquire(self.pool_key)
+        if connection is None:
+            return super().open()
+        self.connection = connection
+        return True
+
+    def close(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            smtp_pool.release(self.pool_key, connection)
+
+    def _send(self, email_message):
+        try:
+            return super()._send(email_message)
+        except Exception:
+            connection, self.connection = self.connection, None
+            if connection is not None:
+                smtp_pool.discard(connection)
+            raise
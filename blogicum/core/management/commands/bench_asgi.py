@@ -0,0 +1,246 @@
+import asyncio
+import functools
+import multiprocessing
+import statistics
+import time
+from http import HTTPStatus
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+)
+from django.core.wsgi import get_wsgi_application
+
+SERVERS = ("wsgi", "asgi")
+# Очередь соединений сервера: при очереди runserver (10 соединений)
+# часть соединений нагрузки ждала бы повторной отправки SYN.
+BACKLOG = 1024
+
+
+class QuietWSGIServer(ThreadedWSGIServer):
+    request_queue_size = BACKLOG
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_wsgi(host, ports, db_workers):
+    """Обслуживать проект многопоточным WSGI-сервером runserver."""
+    server = QuietWSGIServer((host, 0), QuietWSGIRequestHandler)
+    server.set_app(get_wsgi_application())
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def serve_asgi(host, ports, db_workers):
+    """Обслуживать проект ASGI-сервером на asyncio."""
+    settings.ASYNC_DB_WORKERS = db_workers
+    application = get_asgi_application()
+    asyncio.run(serve_forever(application, host, ports))
+
+
+async def serve_forever(application, host, ports):
+    server = await asyncio.start_server(
+        functools.partial(handle_connection, application),
+        host,
+        0,
+        backlog=BACKLOG,
+    )
+    ports.put(server.sockets[0].getsockname()[1])
+    await server.serve_forever()
+
+
+async def handle_connection(application, reader, writer):
+    """Передать ASGI-приложению один HTTP-запрос и закрыть соединение.
+
+    Этого достаточно для нагрузки ниже: она открывает соединение на
+    каждый запрос, как и к WSGI-серверу.
+    """
+    try:
+        method, target, _ = (await reader.readline()).decode().split()
+        headers = []
+        while (line := await reader.readline()).strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((
+                name.strip().lower().encode("latin-1"),
+                value.strip().encode("latin-1"),
+            ))
+        body = await reader.readexactly(
+            int(dict(headers).get(b"content-length", 0)))
+    except (ValueError, asyncio.IncompleteReadError):
+        writer.close()
+        return
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": writer.get_extra_info("peername")[:2],
+        "server": writer.get_extra_info("sockname")[:2],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            writer.write(
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n".encode())
+            for name, value in message.get("headers", ()):
+                writer.write(name + b": " + value + b"\r\n")
+            writer.write(b"Connection: close\r\n\r\n")
+        else:
+            writer.write(message.get("body", b""))
+        await writer.drain()
+
+    try:
+        await application(scope, receive, send)
+    finally:
+        writer.close()
+
+
+async def fetch(host, port, path):
+    """Выполнить GET-запрос и вернуть код ответа."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def load(host, port, urls, concurrency, duration):
+    """Запрашивать urls по кругу в concurrency соединений duration с.
+
+    Возвращает задержки успешных запросов в секундах и число ошибок.
+    """
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client(number):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            try:
+                status = await fetch(host, port, urls[number % len(urls)])
+            except (OSError, ValueError, IndexError):
+                status = None
+            if status == 200:
+                latencies.append(time.monotonic() - start)
+            else:
+                errors += 1
+            number += 1
+
+    await asyncio.gather(*(client(number) for number in range(concurrency)))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    """Сравнить пропускную способность проекта под WSGI и под ASGI.
+
+    Каждый сервер запускается в отдельном процессе с базой и настройками
+    проекта: WSGI — многопоточным сервером runserver, ASGI — простым
+    сервером на asyncio, с которым читающие страницы блога обслуживают
+    асинхронные представления. Нагрузка открывает соединение на каждый
+    запрос и выводит число запросов в секунду и задержки. Страницы
+    должны быть в базе: команда её не заполняет.
+    """
+
+    help = "Сравнить пропускную способность под WSGI и ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--servers",
+            nargs="+",
+            default=list(SERVERS),
+            choices=SERVERS,
+            help="Серверы для сравнения.",
+        )
+        parser.add_argument(
+            "--urls",
+            nargs="+",
+            default=["/", "/?page=2"],
+            help="Адреса, которые запрашиваются по кругу.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Число одновременных соединений.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5,
+            help="Длительность нагрузки на сервер, в секундах.",
+        )
+        parser.add_argument(
+            "--db-workers",
+            type=int,
+            default=settings.ASYNC_DB_WORKERS,
+            help="Размер пула потоков базы под ASGI (ASYNC_DB_WORKERS).",
+        )
+        parser.add_argument(
+            "--host",
+            default="127.0.0.1",
+            help="Адрес, на котором слушают серверы.",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["servers"]:
+            latencies, errors = self.run_server(name, options)
+            rate = len(latencies) / options["duration"]
+            if not latencies:
+                self.stdout.write(f"{name}: нет успешных ответов "
+                                  f"({errors} ошибок)")
+                continue
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{name}: {rate:.0f} запросов/с, "
+                f"p50 {percentiles[49] * 1000:.1f} мс, "
+                f"p95 {percentiles[94] * 1000:.1f} мс "
+                f"({errors} ошибок)"
+            )
+
+    def run_server(self, name, options):
+        context = multiprocessing.get_context("spawn")
+        ports = context.Queue()
+        target = serve_wsgi if name == "wsgi" else serve_asgi
+        process = context.Process(
+            target=target,
+            args=(options["host"], ports, options["db_workers"]),
+            daemon=True,
+        )
+        process.start()
+        try:
+            port = ports.get(timeout=60)
+            # Прогрев: загрузка шаблонов и соединений с базой.
+            asyncio.run(load(
+                options["host"], port, options["urls"], 1, 0.5))
+            return asyncio.run(load(
+                options["host"],
+                port,
+                options["urls"],
+                options["concurrency"],
+                options["duration"],
+            ))
+        finally:
+            process.terminate()
+            process.join()
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_sqlite_pragmas, get_sqlite_profile
+
+POSTS = 100
+
+
+def connect(path, profile):
+    """Открыть соединение, как Django: в автокоммите с явным BEGIN.
+
+    Таймаут ожидания блокировки по умолчанию — 5 секунд.
+    """
+    connection = sqlite3.connect(path, isolation_level=None)
+    apply_sqlite_pragmas(connection, profile["pragmas"])
+    return connection
+
+
+def create_database(path, profile):
+    """Создать базу с постами и комментариями для нагрузки."""
+    connection = connect(path, profile)
+    connection.executescript("""
+        CREATE TABLE post (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            comment_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE comment (
+            id INTEGER PRIMARY KEY,
+            post_id INTEGER NOT NULL REFERENCES post (id),
+            text TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX comment_post_idx ON comment (post_id, created_at);
+    """)
+    connection.executemany(
+        "INSERT INTO post (id, title) VALUES (?, ?)",
+        ((pk, f"Пост {pk}") for pk in range(1, POSTS + 1)),
+    )
+    connection.close()
+
+
+def write_comments(path, profile, duration):
+    """Добавлять комментарии, как CommentCreateView, в течение duration с.
+
+    Возвращает число добавленных комментариев и ошибок блокировки.
+    """
+    connection = connect(path, profile)
+    done = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        post_id = random.randint(1, POSTS)
+        try:
+            connection.execute(f"BEGIN {profile['transaction_mode']}")
+            connection.execute(
+                "SELECT id, title FROM post WHERE id = ?", (post_id,)
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO comment (post_id, text, created_at) "
+                "VALUES (?, ?, ?)",
+                (post_id, "Комментарий " * 20, time.time()),
+            )
+            connection.execute(
+                "UPDATE post SET comment_count = comment_count + 1 "
+                "WHERE id = ?",
+                (post_id,),
+            )
+            connection.execute("COMMIT")
+            done += 1
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            errors += 1
+    connection.close()
+    return "write", done, errors
+
+
+def read_comments(path, profile, duration):
+    """Читать страницы комментариев поста в течение duration с."""
+    connection = connect(path, profile)
+    done = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        post_id = random.randint(1, POSTS)
+        try:
+            connection.execute(
+                "SELECT post.title, post.comment_count, comment.text "
+                "FROM post LEFT JOIN comment ON comment.post_id = post.id "
+                "WHERE post.id = ? ORDER BY comment.created_at DESC "
+                "LIMIT 10",
+                (post_id,),
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    connection.close()
+    return "read", done, errors
+
+
+class Command(BaseCommand):
+    """Нагрузочный тест SQLite с параллельными писателями и читателями.
+
+    Для каждого профиля из SQLITE_PROFILES создаётся отдельная
+    временная база, на которой процессы-писатели добавляют комментарии,
+    а процессы-читатели читают их, как это делают воркеры gunicorn.
+    Выводится пропускная способность и число ошибок «database is locked».
+    """
+
+    help = "Сравнить профили SQLite под параллельной нагрузкой."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=list(settings.SQLITE_PROFILES),
+            choices=list(settings.SQLITE_PROFILES),
+            help="Профили для сравнения.",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=4,
+            help="Число процессов-писателей.",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=8,
+            help="Число процессов-читателей.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5,
+            help="Длительность нагрузки для профиля, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        for profile in options["profiles"]:
+            with tempfile.TemporaryDirectory() as directory:
+                totals = self.run_profile(
+                    os.path.join(directory, "bench.sqlite3"),
+                    get_sqlite_profile(profile),
+                    options,
+                )
+            duration = options["duration"]
+            self.stdout.write(
+                f"{profile}: "
+                f"{totals['write'][0] / duration:.0f} записей/с "
+                f"({totals['write'][1]} ошибок), "
+                f"{totals['read'][0] / duration:.0f} чтений/с "
+                f"({totals['read'][1]} ошибок)"
+            )
+
+    def run_profile(self, path, profile, options):
+        create_database(path, profile)
+        workers = [write_comments] * options["writers"]
+        workers += [read_comments] * options["readers"]
+        totals = {"write": [0, 0], "read": [0, 0]}
+        with ProcessPoolExecutor(
+            max_workers=len(workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = [
+                executor.submit(worker, path, profile, options["duration"])
+                for worker in workers
+            ]
+            for future in futures:
+                kind, done, errors = future.result()
+                totals[kind][0] += done
+                totals[kind][1] += errors
+        return totals
@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from core.jobs import run_jobs
+
+
+class Command(BaseCommand):
+    """Обработчик фоновой очереди задач.
+
+    Функции задач выполняются в пуле процессов, поэтому тяжёлая работа
+    (например, обработка изображений) не занимает ни веб-процессы, ни
+    сам обработчик. С --processes 0 задачи выполняются в текущем процессе.
+    Без --loop команда выполняет накопившиеся задачи и завершается.
+    """
+
+    help = "Выполнять задачи из очереди core.Job."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать непрерывно.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Пауза при пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Число процессов пула; 0 — без пула.",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=None,
+            help="Сколько задач брать за раз; по умолчанию — 2 × processes.",
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        batch = options["batch"] or max(processes * 2, 1)
+        if not processes:
+            self.work(batch, None, options)
+            return
+        # spawn, а не fork: дочерние процессы не наследуют соединения с БД.
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            self.work(batch, executor, options)
+
+    def work(self, batch, executor, options):
+        while True:
+            done = run_jobs(batch, executor)
+            if done:
+                self.stdout.write(f"Выполнено задач: {done}.")
+            if done < batch:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
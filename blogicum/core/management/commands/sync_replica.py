@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """Копирование основной базы SQLite в реплики.
+
+    Заменяет репликацию при локальной проверке на двух файлах SQLite:
+    основная база целиком копируется в каждую реплику из
+    DATABASE_REPLICAS через sqlite3 backup API, не останавливая запись.
+    С --loop копирование повторяется, имитируя отставание реплики.
+    """
+
+    help = "Скопировать основную базу SQLite в реплики."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Копировать непрерывно.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Пауза между копированиями, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]
+        for alias in aliases:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"База {alias} — не SQLite.")
+        if len(aliases) == 1:
+            raise CommandError("Реплики не настроены: DATABASE_REPLICAS пуст.")
+        while True:
+            self.sync(settings.DATABASE_REPLICAS)
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def sync(self, replicas):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in replicas:
+            target = sqlite3.connect(
+                connections[alias].settings_dict["NAME"])
+            try:
+                source.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"{DEFAULT_DB_ALIAS} → {alias}")
@@ -0,0 +1,58 @@
+import base64
+import hashlib
+import os
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import BOOTSTRAP5_DEFAULTS
+
+from core.static import BOOTSTRAP_FILES
+
+
+def check_integrity(data, integrity):
+    """Проверить data по атрибуту integrity вида «sha384-<base64>»."""
+    algorithm, _, expected = integrity.partition("-")
+    digest = base64.b64encode(hashlib.new(algorithm, data).digest()).decode()
+    return digest == expected
+
+
+class Command(BaseCommand):
+    """Положить CSS и JavaScript Bootstrap в статику проекта.
+
+    Файлы той версии, которую подключает django_bootstrap5, скачиваются
+    с CDN (или берутся из каталога dist пакета bootstrap с --source) и
+    проверяются по их хешам integrity. После этого страницы подключают
+    Bootstrap из собственной статики, которую collectstatic снабжает
+    хешами в именах и сжатыми копиями.
+    """
+
+    help = "Скачать Bootstrap в static/vendor/bootstrap."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help="Каталог dist пакета bootstrap вместо загрузки с CDN.",
+        )
+
+    def handle(self, *args, **options):
+        for kind, name in BOOTSTRAP_FILES.items():
+            config = BOOTSTRAP5_DEFAULTS[f"{kind}_url"]
+            data = self.fetch(config["url"], options["source"])
+            if not check_integrity(data, config["integrity"]):
+                raise CommandError(
+                    f"Хеш {config['url']} не совпадает с integrity.")
+            path = os.path.join(settings.STATICFILES_DIRS[0], name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+            self.stdout.write(f"{config['url']} → {path}")
+
+    def fetch(self, url, source):
+        if source is None:
+            with urlopen(url, timeout=30) as response:
+                return response.read()
+        # URL вида .../dist/css/bootstrap.min.css → <source>/css/...
+        relative = url.split("/dist/", 1)[1]
+        with open(os.path.join(source, relative), "rb") as file:
+            return file.read()
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from core.compression import choose_encoding, compress_bytes, compress_stream
+from core.db import reading_from_replicas
+from core.queries import QueryRecorder, get_query_budget
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+# Типы содержимого, которые имеет смысл сжимать.
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class AsyncCapableMiddleware:
+    """Основа middleware, работающего и под WSGI, и под ASGI.
+
+    Под ASGI Django передаёт асинхронный get_response: тогда запрос
+    обрабатывает корутина ahandle() прямо в цикле событий, без перехода
+    в поток, как у синхронных middleware. Иначе запрос обрабатывает
+    handle().
+
+    Атрибуты:
+        - is_async: Работает ли middleware в асинхронном режиме.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django узнаёт, что вызов экземпляра нужно ожидать
+            # (см. django.utils.deprecation.MiddlewareMixin).
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
+
+
+class QueryCountMiddleware(AsyncCapableMiddleware):
+    """Учёт SQL-запросов, выполненных при обработке запроса.
+
+    Запросы записываются только в режиме DEBUG или при QUERY_STATS =
+    True: запись оборачивает каждое соединение и хранит текст всех
+    запросов. Записанные запросы доступны в request.query_stats, без
+    записи там None. В режиме DEBUG число и суммарное время запросов
+    отдаются в заголовках X-Query-Count и X-Query-Time (мс) и пишутся в
+    лог; превышение бюджета URL записывается как предупреждение.
+    """
+
+    def handle(self, request):
+        if not self.is_recording():
+            request.query_stats = None
+            return self.get_response(request)
+        with QueryRecorder() as recorder:
+            request.query_stats = recorder
+            response = self.get_response(request)
+        if settings.DEBUG:
+            self.report(request, response, recorder)
+        return response
+
+    async def ahandle(self, request):
+        if not self.is_recording():
+            request.query_stats = None
+            return await self.get_response(request)
+        with QueryRecorder() as recorder:
+            request.query_stats = recorder
+            response = await self.get_response(request)
+        if settings.DEBUG:
+            self.report(request, response, recorder)
+        return response
+
+    def is_recording(self):
+        return settings.DEBUG or settings.QUERY_STATS
+
+    def report(self, request, response, recorder):
+        total_ms = recorder.total_time * 1000
+        response["X-Query-Count"] = str(recorder.count)
+        response["X-Query-Time"] = f"{total_ms:.1f}"
+        budget = get_query_budget(request.resolver_match)
+        if budget is not None:
+            response["X-Query-Budget"] = str(budget)
+        level = (
+            logging.WARNING
+            if budget is not None and recorder.count > budget
+            else logging.DEBUG
+        )
+        logger.log(
+            level,
+            "%s %s: %d queries (budget %s) in %.1f ms",
+            request.method, request.path, recorder.count, budget, total_ms,
+            extra={"queries": [sql for sql, _ in recorder.queries]},
+        )
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """Направление чтений представлений в реплики базы данных.
+
+    Чтения GET- и HEAD-запросов к представлениям, помеченным
+    core.db.replica_reads, уходят в реплики (см. core.db.ReplicaRouter).
+    После успешного изменяющего запроса клиент получает cookie
+    REPLICA_PIN_COOKIE на REPLICA_PIN_SECONDS секунд: пока она жива, его
+    запросы читают из основной базы и видят свои изменения, даже если
+    реплика ещё не догнала её.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            # Синхронный process_view Django вызвал бы в другом потоке,
+            # и переключение на реплики не дошло бы до представления.
+            self.process_view = self.aprocess_view
+
+    def handle(self, request):
+        with ExitStack() as request.replica_reads:
+            response = self.get_response(request)
+        return self.pin_primary(request, response)
+
+    async def ahandle(self, request):
+        with ExitStack() as request.replica_reads:
+            response = await self.get_response(request)
+        return self.pin_primary(request, response)
+
+    def pin_primary(self, request, response):
+        """Закрепить клиента за основной базой после изменения данных."""
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.route_reads(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.route_reads(request, view_func)
+
+    def route_reads(self, request, view_func):
+        """Направить чтения представления view_func в реплики."""
+        use_replica = getattr(view_func, "use_replica", None)
+        if use_replica is None:
+            view_class = getattr(view_func, "view_class", None)
+            use_replica = getattr(view_class, "use_replica", False)
+        if (
+            request.method in ("GET", "HEAD")
+            and use_replica
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            request.replica_reads.enter_context(reading_from_replicas())
+
+
+class AsgiUrlconfMiddleware(AsyncCapableMiddleware):
+    """Маршрутизация запросов ASGI по ASGI_URLCONF.
+
+    Под ASGI читающие страницы блога обслуживают асинхронные
+    представления (см. blogicum.asgi_urls), под WSGI запросы идут по
+    ROOT_URLCONF.
+    """
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        if settings.ASGI_URLCONF:
+            request.urlconf = settings.ASGI_URLCONF
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """Сжатие ответов в br (если установлен brotli) или gzip.
+
+    Сжимаются текстовые ответы не короче COMPRESSION_MIN_SIZE байт и
+    потоковые ответы — по частям, по мере их отдачи. Если у ответа есть
+    атрибут compressed_cache_key (его ставит кэш страниц, см.
+    FeedPageCacheMixin), сжатое тело хранится в кэше под этим ключом
+    и при следующих попаданиях в кэш страницы не сжимается заново.
+    """
+
+    def handle(self, request):
+        return self.compress(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        encoding = choose_encoding(request)
+        if encoding is None or not self.is_compressible(response):
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            del response["Content-Length"]
+        else:
+            content = self.get_compressed_content(response, encoding)
+            if content is None:
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # Сжатое тело отличается от исходного побайтно.
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header("Content-Encoding"):
+            return False
+        if not response.get("Content-Type", "").startswith(
+                COMPRESSIBLE_TYPES):
+            return False
+        return (
+            response.streaming
+            or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+    def get_compressed_content(self, response, encoding):
+        """Вернуть сжатое тело ответа или None, если сжатие не помогло."""
+        key = getattr(response, "compressed_cache_key", None)
+        if key is not None:
+            key = f"{key}:{encoding}"
+            content = cache.get(key)
+            if content is not None:
+                return content
+        content = compress_bytes(response.content, encoding)
+        if len(content) >= len(response.content):
+            return None
+        if key is not None:
+            cache.set(key, content, response.compressed_cache_timeout)
+        return content
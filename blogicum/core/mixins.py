@@ -1,10 +1,24 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
 from django.views import View
+from django.views.decorators.http import condition
 
 from blog.models import Comment
-from core.utils import get_post_data
+from core.cache import feed_cache_key
+from core.utils import (
+    feed_cache_timeout,
+    get_post_data,
+    get_validators,
+    publish_due_posts,
+)
 
 
 class CommentMixinView(LoginRequiredMixin, View):
@@ -36,3 +50,121 @@ class CommentMixinView(LoginRequiredMixin, View):
     def get_success_url(self):
         post_id = self.kwargs["post_id"]
         return reverse("blog:post_detail", kwargs={"post_id": post_id})
+
+
+def get_feed_page(request, feed_cache_name):
+    """Вернуть ключ кэша страницы ленты и ответ из кэша или None.
+
+    Вместе со страницей хранятся её заголовки ETag и Last-Modified,
+    поэтому на условный запрос из кэша отдаётся 304 Not Modified.
+    """
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    key = feed_cache_key("feed-page", f"{feed_cache_name}:{query}")
+    cached = cache.get(key)
+    if cached is None:
+        return key, None
+    content, headers = cached
+    response = HttpResponse(content)
+    for header, value in headers.items():
+        response[header] = value
+    last_modified = headers.get("Last-Modified")
+    return key, get_conditional_response(
+        request,
+        etag=headers.get("ETag"),
+        last_modified=(
+            parse_http_date_safe(last_modified) if last_modified else None
+        ),
+        response=response,
+    )
+
+
+def store_feed_page(key, response, fresh):
+    """Сохранить свежую страницу ленты response в кэш под ключом key.
+
+    Запись живёт не дольше момента ближайшей отложенной публикации.
+    Сжатое тело страницы хранится рядом с ней (CompressionMiddleware),
+    в том числе для страницы, взятой из кэша.
+    """
+    timeout = feed_cache_timeout(settings.FEED_PAGE_CACHE_TIMEOUT)
+    if response.status_code != 200 or not timeout:
+        return
+    if fresh:
+        headers = {
+            header: response[header]
+            for header in ("ETag", "Last-Modified")
+            if response.has_header(header)
+        }
+        cache.set(key, (response.content, headers), timeout)
+    response.compressed_cache_key = f"{key}:compressed"
+    response.compressed_cache_timeout = timeout
+
+
+class FeedPageCacheMixin:
+    """Mixin кэширования отрендеренной страницы ленты для анонимов.
+
+    Ключ кэша состоит из имени ленты и параметров страницы, а версия
+    лент в ключе сбрасывает его при изменении постов, категорий,
+    местоположений и счётчиков комментариев. Запись живёт не дольше
+    момента ближайшей отложенной публикации. Вместе со страницей
+    хранятся её заголовки ETag и Last-Modified, поэтому условные
+    запросы к закэшированной странице получают 304 без обращения к БД.
+
+    Атрибуты:
+        - feed_cache_name: Имя ленты в ключе кэша.
+    """
+
+    feed_cache_name = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key, response = get_feed_page(request, self.feed_cache_name)
+        fresh = response is None
+        if fresh:
+            response = super().dispatch(request, *args, **kwargs)
+        store_feed_page(key, response, fresh)
+        return response
+
+
+class ConditionalGetMixin:
+    """Mixin ответа 304 Not Modified для неизменившихся страниц с постами.
+
+    ETag и Last-Modified вычисляются одним запросом по постам страницы
+    и их комментариям ещё до рендеринга; если они совпадают с
+    присланными клиентом, страница не рендерится. Результат запроса
+    хранится в кэше ленты, имя которой возвращает get_validator_feed().
+
+    Методы:
+        - get_validator_queryset(): Возвращает посты, от которых зависит
+        содержимое страницы.
+        - get_validator_state(): Возвращает значения объекта, который
+        страница показывает помимо постов, и дату его изменения.
+        - get_validator_feed(): Возвращает имя ленты для кэша состояния
+        постов или None, чтобы не кэшировать его.
+    """
+
+    def get_validator_queryset(self):
+        raise NotImplementedError(
+            "Определите get_validator_queryset() в классе представления."
+        )
+
+    def get_validator_state(self):
+        return (), None
+
+    def get_validator_feed(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        publish_due_posts()
+        page_state, page_changed = self.get_validator_state()
+        etag, last_modified = get_validators(
+            self.get_validator_queryset(), request.user,
+            page_state, page_changed, self.get_validator_feed(),
+        )
+        view = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )(super().dispatch)
+        return view(request, *args, **kwargs)
@@ -1,4 +1,21 @@
 from django.db import models
+from django.utils import timezone
+
+from core.cache import invalidate_feeds
+
+
+class BaseQuerySet(models.QuerySet):
+    """QuerySet, обновляющий updated_at и при массовых изменениях.
+
+    Массовое изменение, как и сохранение объекта, сбрасывает кэши лент.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        updated = super().update(**kwargs)
+        if updated:
+            invalidate_feeds()
+        return updated
 
 
 class BaseModel(models.Model):
@@ -8,6 +25,8 @@ class BaseModel(models.Model):
         - is_published: Поле для указания статуса публикации.
         - created_at: Поле, автоматически устанавливающее дату и время
         создания записи.
+        - updated_at: Дата и время последнего изменения записи, в том
+        числе через QuerySet.update().
     """
 
     is_published = models.BooleanField(
@@ -19,6 +38,13 @@ class BaseModel(models.Model):
         auto_now_add=True,
         verbose_name="Добавлено",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Изменено",
+    )
+
+    objects = BaseQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -34,3 +60,91 @@ class BaseTitle(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Job(models.Model):
+    """Задача фоновой очереди.
+
+    Задачи выполняет команда run_jobs; брокер не нужен, очередь хранится
+    в базе данных.
+
+    Атрибуты:
+        - task: Путь к функции задачи, например blog.tasks.some_task.
+        - args: Позиционные аргументы функции (JSON-список).
+        - kwargs: Именованные аргументы функции (JSON-объект).
+        - status: Состояние задачи.
+        - attempts: Число сделанных попыток выполнения.
+        - run_after: Дата и время, раньше которых задачу не запускать.
+        - locked_at: Когда задачу взял обработчик.
+        - last_error: Текст последней ошибки.
+        - created_at: Дата и время постановки в очередь.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    task = models.CharField(
+        max_length=256,
+        verbose_name="Задача",
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Позиционные аргументы",
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Именованные аргументы",
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток",
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Не раньше",
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Взята в работу",
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Добавлено",
+    )
+
+    class Meta:
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("run_after", "id")
+        indexes = (
+            # Выборка очередных задач обработчиком.
+            models.Index(
+                fields=("run_after", "id"),
+                condition=models.Q(status="pending"),
+                name="job_pending_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.task} #{self.pk}"
@@ -0,0 +1,85 @@
+import time
+from contextvars import ContextVar
+from importlib import import_module
+
+_active_recorders = ContextVar("query_recorders", default=())
+
+
+class QueryRecorder:
+    """Контекстный менеджер, записывающий SQL-запросы ко всем базам.
+
+    В отличие от connection.queries работает и при DEBUG = False.
+    Записываются запросы всех потоков, работающих в контексте блока:
+    под ASGI это и синхронные представления и middleware, которые Django
+    выполняет через sync_to_async, и функции core.db.run_db (см.
+    record_query()).
+
+    Атрибуты:
+        - queries: Список пар (sql, время выполнения в секундах).
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._token = None
+
+    def __enter__(self):
+        self._token = _active_recorders.set(
+            (*_active_recorders.get(), self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_recorders.reset(self._token)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration in self.queries)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения запросов, передающая их активным QueryRecorder.
+
+    Активные записывающие блоки хранятся в переменной контекста, а
+    sync_to_async и run_db копируют контекст в свои потоки, поэтому
+    запросы из них попадают в учёт вызывающего кода. Вне блоков обёртка
+    только вызывает execute.
+    """
+    recorders = _active_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start = time.monotonic()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.monotonic() - start
+        for recorder in recorders:
+            recorder.queries.append((sql, duration))
+
+
+def install_query_recording(sender, connection, **kwargs):
+    """Подключить record_query() к новому соединению с базой.
+
+    Обработчик сигнала connection_created. Соединения с базой у каждого
+    потока свои, поэтому обёртка ставится на каждое. Она встаёт первой:
+    connection.execute_wrapper() снимает последнюю обёртку списка.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def get_query_budget(resolver_match):
+    """Вернуть бюджет запросов для URL или None.
+
+    Бюджеты объявляются в словаре query_budgets модуля urls приложения
+    под именами URL.
+    """
+    if resolver_match is None or not resolver_match.app_name:
+        return None
+    try:
+        urls = import_module(f"{resolver_match.app_name}.urls")
+    except ImportError:
+        return None
+    return getattr(urls, "query_budgets", {}).get(resolver_match.url_name)
@@ -0,0 +1,70 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from core.compression import get_accepted_encodings
+
+# Файлы Bootstrap в статике проекта; кладёт их команда vendor_bootstrap.
+BOOTSTRAP_FILES = {
+    "css": "vendor/bootstrap/css/bootstrap.min.css",
+    "javascript": "vendor/bootstrap/js/bootstrap.bundle.min.js",
+}
+
+# Имя файла с хешем содержимого от ManifestStaticFilesStorage.
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+
+# Сжатые копии в порядке предпочтения: (Content-Encoding, расширение).
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def serve(request, path):
+    """Отдать файл статики из STATIC_ROOT.
+
+    Если клиент принимает br или gzip и collectstatic сохранил сжатую
+    копию файла, отдаётся она. Файлы с хешем в имени не меняются, поэтому
+    кэшируются браузером навсегда (immutable), остальные —
+    на STATIC_MAX_AGE секунд.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    fullpath = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404("Файл не найден.")
+    stat = os.stat(fullpath)
+    if not was_modified_since(
+        request.META.get("HTTP_IF_MODIFIED_SINCE"),
+        stat.st_mtime,
+        stat.st_size,
+    ):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = get_accepted_encodings(request)
+    filename, encoding = fullpath, None
+    for coding, extension in ENCODINGS:
+        if coding in accepted and os.path.isfile(fullpath + extension):
+            filename, encoding = fullpath + extension, coding
+            break
+    response = FileResponse(
+        open(filename, "rb"),
+        content_type=content_type or "application/octet-stream",
+    )
+    # FileResponse подставляет имя файла (с .gz/.br), для статики оно
+    # не нужно.
+    del response["Content-Disposition"]
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Vary"] = "Accept-Encoding"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    if HASHED_NAME_RE.search(path):
+        response["Cache-Control"] = (
+            f"public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable")
+    else:
+        response["Cache-Control"] = (
+            f"public, max-age={settings.STATIC_MAX_AGE}")
+    return response
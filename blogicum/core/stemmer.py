@@ -0,0 +1,169 @@
+"""Разбор русского текста для поискового индекса.
+
+Стеммер реализует алгоритм Snowball для русского языка
+(https://snowballstem.org/algorithms/russian/stemmer.html): от слова
+отсекаются окончания и суффиксы, так что разные формы слова дают одну
+основу («кометы», «комете», «кометой» → «комет»).
+"""
+import re
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+
+VOWELS = "аеиоуыэюя"
+
+STOP_WORDS = frozenset("""
+    а без более бы был была были было быть в вам вас вдруг ведь во вот
+    впрочем все всегда всего всех всю вы где да даже два для до другой
+    его ее ей ему если есть еще ж же за зачем здесь и из или им иногда их
+    к как какая какой когда конечно кто куда ли лучше между меня мне
+    много может можно мой моя мы на над надо наконец нас не него нее ней
+    нельзя нет ни нибудь никогда ним них ничего но ну о об один он она
+    они опять от перед по под после потом потому почти при про раз разве
+    с сам свою себе себя сейчас со совсем так такой там тебя тем теперь
+    то тогда того тоже только том тот три тут ты у уж уже хорошо хоть
+    чего чем через что чтоб чтобы чуть эти этого этой этом этот эту я
+""".split())
+
+PERFECTIVE_GERUND = (
+    ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв"),
+    ("вшись", "вши", "в"),
+)
+REFLEXIVE = ("ся", "сь")
+ADJECTIVE = tuple(sorted((
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей",
+    "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая",
+    "яя", "ою", "ею",
+), key=len, reverse=True))
+PARTICIPLE = (
+    ("ивш", "ывш", "ующ"),
+    ("ем", "нн", "вш", "ющ", "щ"),
+)
+VERB = (
+    (
+        "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей",
+        "уй", "ил", "ыл", "им", "ым", "ен", "ило", "ыло", "ено", "ят",
+        "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю",
+    ),
+    (
+        "ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но",
+        "ет", "ют", "ны", "ть", "ешь", "нно",
+    ),
+)
+NOUN = tuple(sorted((
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие",
+    "ье", "еи", "ии", "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях",
+    "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у", "ы", "ь", "ю",
+    "я",
+), key=len, reverse=True))
+SUPERLATIVE = ("ейше", "ейш")
+DERIVATIONAL = ("ость", "ост")
+
+
+def _strip(word, start, endings, after_a=False):
+    """Отсечь самое длинное окончание из endings, лежащее в word[start:].
+
+    С after_a окончание должно следовать за «а» или «я» (они остаются).
+    Возвращает укороченное слово или None, если окончание не найдено.
+    """
+    for ending in endings:
+        cut = len(word) - len(ending)
+        if cut < start or not word.endswith(ending):
+            continue
+        if after_a and (cut - 1 < start or word[cut - 1] not in "ая"):
+            continue
+        return word[:cut]
+    return None
+
+
+def _strip_grouped(word, start, groups):
+    """Отсечь окончание из пары групп: (без условия, после «а»/«я»)."""
+    candidates = [
+        (ending, after_a)
+        for endings, after_a in zip(groups, (False, True))
+        for ending in endings
+    ]
+    candidates.sort(key=lambda item: len(item[0]), reverse=True)
+    for ending, after_a in candidates:
+        stripped = _strip(word, start, (ending,), after_a)
+        if stripped is not None:
+            return stripped
+    return None
+
+
+def _regions(word):
+    """Вернуть начала областей RV и R2 слова."""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    """Вернуть основу русского слова в нижнем регистре."""
+    word = word.lower().replace("ё", "е")
+    rv, r2 = _regions(word)
+
+    # Шаг 1: деепричастие, иначе возвратная частица и окончание
+    # прилагательного, причастия, глагола или существительного.
+    stripped = _strip_grouped(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        adjective = _strip(word, rv, ADJECTIVE)
+        if adjective is not None:
+            stripped = _strip_grouped(adjective, rv, PARTICIPLE) or adjective
+        else:
+            stripped = (
+                _strip_grouped(word, rv, VERB)
+                or _strip(word, rv, NOUN)
+            )
+    word = stripped or word
+
+    # Шаг 2: конечное «и».
+    word = _strip(word, rv, ("и",)) or word
+
+    # Шаг 3: словообразовательный суффикс в R2.
+    word = _strip(word, r2, DERIVATIONAL) or word
+
+    # Шаг 4: удвоенное «н», превосходная степень, мягкий знак.
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        return word[:-1]
+    superlative = _strip(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith("нн") and len(word) - 1 >= rv:
+            word = word[:-1]
+        return word
+    return _strip(word, rv, ("ь",)) or word
+
+
+def normalize(token):
+    """Привести слово к нижнему регистру и заменить «ё» на «е»."""
+    return token.lower().replace("ё", "е")
+
+
+def tokenize(text):
+    """Разбить текст на термы: нормализованные основы без стоп-слов.
+
+    Русские слова сводятся к основе стеммером, остальные (латиница,
+    числа) остаются как есть.
+    """
+    terms = []
+    for token in TOKEN_RE.findall(text or ""):
+        token = normalize(token)
+        if token in STOP_WORDS:
+            continue
+        terms.append(stem(token) if CYRILLIC_RE.search(token) else token)
+    return terms
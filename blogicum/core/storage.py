@@ -0,0 +1,63 @@
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from core.compression import brotli
+
+logger = logging.getLogger(__name__)
+
+# Расширения файлов, которые имеет смысл сжимать; картинки и шрифты
+# woff2 уже сжаты.
+COMPRESSIBLE_EXTENSIONS = (
+    ".css", ".js", ".map", ".svg", ".txt", ".json", ".xml", ".html", ".ico",
+)
+# Сжатая копия сохраняется, только если она меньше этой доли оригинала.
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def compress(data):
+    """Вернуть сжатые варианты data: {расширение: байты}."""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хешами в именах и сжатыми копиями файлов.
+
+    При collectstatic каждый файл получает имя с хешем содержимого (см.
+    ManifestStaticFilesStorage), а рядом с текстовыми файлами
+    сохраняются копии .gz и, если установлен brotli, .br — их отдаёт
+    core.static.serve. Ссылки на файлы, которых нет среди статики,
+    остаются без хеша, а не роняют страницу.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        """Сохранить сжатые копии файла name рядом с ним."""
+        path = self.path(name)
+        with open(path, "rb") as file:
+            data = file.read()
+        for extension, compressed in compress(data).items():
+            if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+                with open(path + extension, "wb") as file:
+                    file.write(compressed)
+            elif os.path.exists(path + extension):
+                os.remove(path + extension)
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning("Файла статики %s нет в манифесте.", name)
+            return name
@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags import django_bootstrap5
+
+from core.static import BOOTSTRAP_FILES
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def is_vendored(name):
+    """Есть ли файл name в статике проекта."""
+    return finders.find(name) is not None
+
+
+@register.simple_tag
+def bootstrap_stylesheet():
+    """Подключить CSS Bootstrap из статики проекта, иначе — с CDN."""
+    name = BOOTSTRAP_FILES["css"]
+    if is_vendored(name):
+        return format_html('<link href="{}" rel="stylesheet">', static(name))
+    return django_bootstrap5.bootstrap_css()
+
+
+@register.simple_tag
+def bootstrap_script():
+    """Подключить JavaScript Bootstrap из статики проекта, иначе — с CDN."""
+    name = BOOTSTRAP_FILES["javascript"]
+    if is_vendored(name):
+        return format_html('<script src="{}"></script>', static(name))
+    return django_bootstrap5.bootstrap_javascript()
@@ -1,31 +1,51 @@
-from django.db.models import Count
+import asyncio
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page
+from django.db.models import (
+    BooleanField, Count, ExpressionWrapper, Max, Min, Q,
+)
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 
 from blog.models import Post
-from django.core.paginator import Paginator
-
+from core.cache import CachedCountPaginator, feed_cache_key, invalidate_feeds
+from core.db import run_db
 
-def annotate_comment_count(queryset):
-    """Добавить аннотацию количества комментариев и применить сортировку."""
-    return queryset.annotate(
-        comment_count=Count("comments")).order_by("-pub_date")
+# Порядок лент: от новых к старым, id разрешает совпадения pub_date.
+FEED_ORDERING = ("-pub_date", "-pk")
+# Порядок комментариев: от старых к новым.
+COMMENT_ORDERING = ("created_at", "pk")
 
 
 def post_all_query():
-    """Вернуть все посты с аннотацией количества комментариев."""
-    query_set = Post.objects.select_related(
+    """Вернуть все посты со связанными объектами в порядке ленты.
+
+    Количество комментариев хранится в Post.comment_count, поэтому
+    ленте не нужны JOIN и GROUP BY по таблице комментариев.
+    """
+    return Post.objects.select_related(
         "category",
         "location",
         "author",
-    )
-    return annotate_comment_count(query_set)
+    ).order_by(*FEED_ORDERING)
 
 
 def post_published_query():
-    """Вернуть опубликованные посты с аннотацией количества комментариев."""
+    """Вернуть опубликованные посты в порядке ленты.
+
+    Вместо сравнения pub_date с текущим временем используется флаг
+    is_live, поэтому условие запроса не меняется от запроса к запросу.
+    """
+    publish_due_posts()
     query_set = post_all_query().filter(
-        pub_date__lte=timezone.now(),
+        is_live=True,
         is_published=True,
         category__isnull=False,
         category__is_published=True,
@@ -33,19 +53,368 @@ def post_published_query():
     return query_set
 
 
+def post_visible_q():
+    """Вернуть условие видимости поста читателям.
+
+    Пост виден, если он опубликован, его дата публикации наступила и его
+    категория опубликована — те же условия, что в post_published_query().
+    """
+    return Q(is_published=True, is_live=True, category__is_published=True)
+
+
+def annotate_visibility(queryset):
+    """Добавить аннотацию is_visible: виден ли пост читателям."""
+    return queryset.annotate(is_visible=ExpressionWrapper(
+        post_visible_q(), output_field=BooleanField(),
+    ))
+
+
+def get_feed_state(queryset, feed=None):
+    """Вернуть состояние постов queryset для get_validators().
+
+    Считается одним агрегирующим запросом по постам, их категориям и
+    местоположениям; изменения комментариев отражаются в updated_at
+    поста. Если задано имя ленты feed, состояние берётся из кэша: версия
+    лент в ключе сбрасывает его при любом изменении, которое оно
+    отражает.
+    """
+    if feed is not None:
+        key = feed_cache_key("feed-state", feed)
+        state = cache.get(key)
+        if state is not None:
+            return state
+    state = queryset.order_by().aggregate(
+        post_total=Count("pk"),
+        visible_total=Count("pk", filter=post_visible_q()),
+        last_post=Max("updated_at"),
+        last_category=Max("category__updated_at"),
+        last_location=Max("location__updated_at"),
+    )
+    if feed is not None:
+        cache.set(key, state, settings.FEED_COUNT_CACHE_TIMEOUT)
+    return state
+
+
+def get_validators(
+    queryset, user, page_state=(), page_changed=None, feed=None
+):
+    """Вернуть ETag и дату последнего изменения страницы с постами.
+
+    Значения считаются по состоянию постов queryset (get_feed_state(),
+    из кэша ленты feed, если она задана) без рендеринга страницы, см.
+    make_validators().
+    """
+    return make_validators(
+        get_feed_state(queryset, feed), user, page_state, page_changed)
+
+
+def make_validators(state, user, page_state=(), page_changed=None):
+    """Вернуть ETag и дату последнего изменения по состоянию постов.
+
+    Объект, который страница показывает помимо постов (категория,
+    профиль автора), передаётся значениями page_state и датой изменения
+    page_changed. ETag зависит от пользователя, потому что автор видит
+    страницу иначе; дата изменения возвращается только для анонимов,
+    иначе None.
+    """
+    fingerprint = ":".join(
+        str(value) for value in (user.pk, *state.values(), *page_state))
+    etag = 'W/"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+    changes = [
+        value for value in (
+            state["last_post"],
+            state["last_category"],
+            state["last_location"],
+            page_changed,
+        )
+        if value is not None
+    ]
+    if user.is_authenticated or not changes:
+        return etag, None
+    return etag, max(changes)
+
+
+def category_state(category, sidebar=()):
+    """Вернуть для get_validators() состояние категории и дату изменения.
+
+    Вместе с категорией учитываются категории боковой панели sidebar,
+    включая снятые с публикации: иначе их скрытие не изменило бы ETag.
+    Изменение названия или описания категории обновляет её updated_at.
+    """
+    categories = (category, *sidebar)
+    return (
+        tuple(
+            (item.pk, item.is_published, item.updated_at)
+            for item in categories
+        ),
+        max(item.updated_at for item in categories),
+    )
+
+
+def profile_state(author):
+    """Вернуть для get_validators() состояние профиля автора.
+
+    У пользователя нет даты изменения, поэтому в ETag входят сами поля,
+    которые показывает страница профиля.
+    """
+    return (
+        (
+            author.pk,
+            author.get_username(),
+            author.get_full_name(),
+            author.date_joined,
+            author.is_staff,
+        ),
+        None,
+    )
+
+
 def get_post_data(post_data):
     """Вернуть объект поста по id и проверке публикации."""
+    publish_due_posts()
     return get_object_or_404(
         Post,
         pk=post_data["post_id"],
-        pub_date__lte=timezone.now(),
+        is_live=True,
         is_published=True,
         category__is_published=True,
     )
 
 
-def get_page(request, queryset, per_page=10):
-    """Вернуть одну страницу из пагинатора."""
-    paginator = Paginator(queryset, per_page)
-    page_number = request.GET.get("page")
-    return paginator.get_page(page_number)
+def next_publication_date():
+    """Вернуть ближайшую дату публикации поста, ещё не попавшего в ленту.
+
+    Значение кэшируется до этой даты и сбрасывается вместе с версией лент.
+    """
+    key = feed_cache_key("next-pub-date", "all")
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+    pub_date = Post.objects.filter(
+        is_live=False,
+    ).aggregate(next=Min("pub_date"))["next"]
+    timeout = settings.FEED_PAGE_CACHE_TIMEOUT
+    if pub_date is not None:
+        timeout = min(
+            timeout, (pub_date - timezone.now()).total_seconds())
+    if timeout > 0:
+        cache.set(key, (pub_date,), math.ceil(timeout))
+    return pub_date
+
+
+def publish_scheduled_posts():
+    """Перевести в ленту посты, дата публикации которых наступила.
+
+    Возвращает количество переведённых постов.
+    """
+    published = Post.objects.filter(
+        is_live=False, pub_date__lte=timezone.now(),
+    ).update(is_live=True)
+    return published
+
+
+def publish_due_posts():
+    """Перевести в ленту наступившие публикации, если такие есть.
+
+    Проверка стоит одного обращения к кэшу, пока не наступит дата
+    ближайшей отложенной публикации.
+    """
+    pub_date = next_publication_date()
+    if pub_date is not None and pub_date <= timezone.now():
+        if not publish_scheduled_posts():
+            # Посты уже перевёл другой процесс: сбросить устаревший кэш.
+            invalidate_feeds()
+
+
+def feed_cache_timeout(timeout):
+    """Ограничить время кэширования ленты моментом следующей публикации.
+
+    Возвращает 0, если кэшировать не нужно.
+    """
+    pub_date = next_publication_date()
+    if pub_date is None:
+        return timeout
+    seconds = (pub_date - timezone.now()).total_seconds()
+    return max(0, min(timeout, math.floor(seconds)))
+
+
+class CursorPage:
+    """Страница, выбранная по курсору (keyset-пагинация).
+
+    В отличие от страницы Paginator не знает ни общего числа записей,
+    ни своего номера: соседние страницы доступны только по курсорам.
+
+    Атрибуты:
+        - object_list: Записи страницы.
+        - next_cursor: Курсор следующей страницы или None.
+        - previous_cursor: Курсор предыдущей страницы или None.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _ordering_fields(ordering):
+    """Вернуть пары (поле, по убыванию) для сортировки."""
+    return [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+
+def encode_cursor(obj, ordering, direction):
+    """Закодировать позицию записи obj в непрозрачный курсор."""
+    values = [
+        getattr(obj, name).isoformat()
+        if hasattr(getattr(obj, name), "isoformat")
+        else str(getattr(obj, name))
+        for name, _ in _ordering_fields(ordering)
+    ]
+    return urlsafe_base64_encode(force_bytes("|".join([direction, *values])))
+
+
+def decode_cursor(cursor, model, ordering):
+    """Вернуть направление и значения ключа из курсора.
+
+    Для пустого или повреждённого курсора возвращается (None, None).
+    """
+    if not cursor:
+        return None, None
+    try:
+        direction, *raw_values = force_str(
+            urlsafe_base64_decode(cursor)).split("|")
+        fields = _ordering_fields(ordering)
+        if direction not in ("next", "prev") or len(raw_values) != len(fields):
+            return None, None
+        values = []
+        for (name, _), raw in zip(fields, raw_values):
+            field = (
+                model._meta.pk if name == "pk" else model._meta.get_field(name)
+            )
+            values.append(field.to_python(raw))
+    except (ValueError, TypeError, ValidationError):
+        return None, None
+    return direction, values
+
+
+def _keyset_filter(ordering, values, backwards):
+    """Вернуть условие «строго после ключа» в порядке ordering."""
+    condition = Q()
+    equal = {}
+    for (name, descending), value in zip(_ordering_fields(ordering), values):
+        lookup = "lt" if descending != backwards else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+def get_cursor_page(queryset, cursor, per_page=10, ordering=FEED_ORDERING):
+    """Вернуть страницу по курсору без OFFSET и COUNT(*).
+
+    Выбирается per_page + 1 запись после ключа курсора: лишняя запись
+    только сообщает, что за страницей есть продолжение.
+    """
+    direction, values = decode_cursor(cursor, queryset.model, ordering)
+    backwards = direction == "prev"
+    page_query = queryset.order_by(*ordering)
+    if values is not None:
+        page_query = page_query.filter(
+            _keyset_filter(ordering, values, backwards))
+    if backwards:
+        page_query = page_query.reverse()
+    rows = list(page_query[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        if not rows:
+            return get_cursor_page(queryset, None, per_page, ordering)
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, values is not None
+    return CursorPage(
+        rows,
+        next_cursor=(
+            encode_cursor(rows[-1], ordering, "next")
+            if rows and has_next else None
+        ),
+        previous_cursor=(
+            encode_cursor(rows[0], ordering, "prev")
+            if rows and has_previous else None
+        ),
+    )
+
+
+def get_page(
+    request, queryset, per_page=10, ordering=FEED_ORDERING, feed=None
+):
+    """Вернуть одну страницу ленты.
+
+    С параметром cursor страница выбирается по ключу сортировки и стоит
+    одинаково на любой глубине (пустой cursor — первая страница); с
+    параметром page — по номеру через Paginator. Страница по номеру
+    ссылается на соседние тоже по номерам, страница по курсору — по
+    курсорам. Если задано имя ленты feed, общее число записей берётся
+    из кэша.
+    """
+    cursor = request.GET.get("cursor")
+    if cursor is not None:
+        return get_cursor_page(queryset, cursor, per_page, ordering)
+    paginator = CachedCountPaginator(
+        queryset.order_by(*ordering), per_page, feed=feed)
+    return paginator.get_page(request.GET.get("page"))
+
+
+def _get_loaded_page(paginator, number):
+    page = paginator.get_page(number)
+    page.object_list = list(page.object_list)
+    return page
+
+
+async def aget_page(
+    request, queryset, per_page=10, ordering=FEED_ORDERING, feed=None
+):
+    """Асинхронный вариант get_page: запросы выполняются через run_db.
+
+    Записи страницы с запрошенным номером и общее число записей
+    выбираются параллельно. Если номер оказался больше числа страниц,
+    последняя страница выбирается отдельным запросом, как в
+    Paginator.get_page(). Записи возвращаемой страницы уже загружены.
+    """
+    cursor = request.GET.get("cursor")
+    if cursor is not None:
+        return await run_db(
+            get_cursor_page, queryset, cursor, per_page, ordering)
+    paginator = CachedCountPaginator(
+        queryset.order_by(*ordering), per_page, feed=feed)
+    try:
+        number = int(request.GET.get("page") or 1)
+    except ValueError:
+        number = 1
+    bottom = (max(number, 1) - 1) * per_page
+    _, rows = await asyncio.gather(
+        run_db(getattr, paginator, "count"),
+        run_db(list, paginator.object_list[bottom:bottom + per_page]),
+    )
+    if 1 <= number <= paginator.num_pages:
+        return Page(rows, number, paginator)
+    return await run_db(_get_loaded_page, paginator, number)
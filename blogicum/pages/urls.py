@@ -1,19 +1,23 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
+from core.db import replica_reads
+
 app_name = "pages"
 
 urlpatterns = [
     # Страница о проекте.
     path(
         "about/",
-        TemplateView.as_view(template_name="pages/about.html"),
+        replica_reads(
+            TemplateView.as_view(template_name="pages/about.html")),
         name="about",
     ),
     # Страница правила.
     path(
         "rules/",
-        TemplateView.as_view(template_name="pages/rules.html"),
+        replica_reads(
+            TemplateView.as_view(template_name="pages/rules.html")),
         name="rules",
     ),
 ]
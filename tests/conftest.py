@@ -41,6 +41,39 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True, scope="session")
+def temporary_cache_dir(tmp_path_factory):
+    """Держать файловый кэш тестов вне каталога кэша проекта."""
+    from django.conf import settings
+
+    caches = {
+        **settings.CACHES,
+        "default": {
+            **settings.CACHES["default"],
+            "LOCATION": str(tmp_path_factory.mktemp("cache")),
+        },
+    }
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def enable_query_stats():
+    with override_settings(QUERY_STATS=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -257,6 +290,27 @@ def get_get_response_safely(
     return response
 
 
+def get_response_within_query_budget(
+        client: Client, url: str, method: str = "get", **kwargs
+) -> HttpResponse:
+    """Make a request and check the number of SQL queries it ran against
+    the budget declared for the URL in `query_budgets` of the app urls."""
+    from core.queries import get_query_budget
+
+    response = getattr(client, method)(url, **kwargs)
+    stats = response.wsgi_request.query_stats
+    budget = get_query_budget(response.wsgi_request.resolver_match)
+    assert budget is not None, (
+        f"Убедитесь, что для адреса `{url}` объявлен бюджет SQL-запросов."
+    )
+    sql = "\n".join(sql for sql, _ in stats.queries)
+    assert stats.count <= budget, (
+        f"Запрос {method.upper()} `{url}` выполнил {stats.count} SQL-запросов"
+        f" при бюджете {budget}:\n{sql}"
+    )
+    return response
+
+
 def get_a_post_get_response_safely(
         user_client: Client, post_id: Union[str, int]
 ) -> HttpResponse:
@@ -362,6 +416,7 @@ def cleanup(request):
             if (
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
+                    or filename.endswith(".webp")
                     or filename.endswith(".png")
             ):
                 file_path = os.path.join(root, filename)
@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def admin_client_():
+    admin = get_user_model().objects.create_superuser(
+        "admin", "admin@example.com", "password")
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+def _changelist_query_count(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.wsgi_request.query_stats.count
+
+
+@pytest.mark.parametrize(
+    ("url", "model", "factory_kwargs"),
+    [
+        ("/admin/blog/post/", "blog.Post", {}),
+        ("/admin/blog/comment/", "blog.Comment", {}),
+        ("/admin/blog/location/", "blog.Location", {}),
+    ],
+    ids=["posts", "comments", "locations"],
+)
+def test_changelist_query_count_is_constant(
+        admin_client_, mixer, url, model, factory_kwargs
+):
+    mixer.cycle(2).blend(model, **factory_kwargs)
+    few = _changelist_query_count(admin_client_, url)
+    mixer.cycle(N_PER_PAGE * 2).blend(model, **factory_kwargs)
+    many = _changelist_query_count(admin_client_, url)
+    assert many <= few, (
+        f"Убедитесь, что число SQL-запросов списка `{url}` в админке не"
+        f" растёт с числом строк: {few} для 2 строк, {many} для"
+        f" {N_PER_PAGE * 2 + 2}."
+    )
+
+
+def test_post_changelist_sorts_by_comment_count(
+        admin_client_, mixer, post_with_published_location
+):
+    mixer.cycle(3).blend("blog.Comment", post=post_with_published_location)
+    mixer.blend("blog.Post")
+    response = admin_client_.get("/admin/blog/post/", {"o": "-5"})
+    posts = list(response.context["cl"].result_list)
+    assert posts[0] == post_with_published_location
+    assert posts[0].comment_count == 3
@@ -0,0 +1,158 @@
+import threading
+from contextvars import ContextVar
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import AsyncClient
+
+from blog import async_views
+from blog.models import Category
+from core.db import run_db
+from core.queries import QueryRecorder
+from core.utils import aget_page, get_page, post_published_query
+
+# Потоки пула открывают свои соединения с базой и не видят данных
+# незавершённой транзакции теста.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def async_get(url, user=None, headers=None):
+    client = AsyncClient()
+    if user is not None:
+        client.force_login(user)
+
+    async def get():
+        # AsyncClient передаёт дополнительные аргументы как заголовки.
+        return await client.get(url, **(headers or {}))
+
+    return async_to_sync(get)()
+
+
+@pytest.fixture
+def read_urls(user, published_category, post_with_published_location,
+              many_posts_with_published_locations):
+    return {
+        "index": ["/", "/?page=2", "/?page=100", "/?page=x"],
+        "category_posts": [f"/category/{published_category.slug}/"],
+        "profile": [f"/profile/{user.username}/"],
+        "post_detail": [f"/posts/{post_with_published_location.id}/"],
+    }
+
+
+def test_asgi_serves_async_views(read_urls, client, user, user_client):
+    for name, urls in read_urls.items():
+        for url in urls:
+            response = async_get(url)
+            assert response.asgi_request.resolver_match.func == getattr(
+                async_views, name), (
+                f"Убедитесь, что под ASGI страницу `{url}` обслуживает "
+                "асинхронное представление."
+            )
+            assert response.content == client.get(url).content, (
+                f"Убедитесь, что асинхронный вариант страницы `{url}` "
+                "совпадает с синхронным."
+            )
+            authorized = async_get(url, user)
+            assert authorized.status_code == 200
+            assert user.username.encode() in authorized.content
+    assert client.get("/").wsgi_request.resolver_match.func.view_class
+
+
+def test_async_views_not_found(user):
+    assert async_get("/posts/999999/").status_code == 404
+    assert async_get("/category/missing/").status_code == 404
+    assert async_get("/profile/missing/", user).status_code == 404
+
+
+def test_async_views_not_modified(read_urls):
+    for urls in read_urls.values():
+        url = urls[0]
+        response = async_get(
+            url, headers={"If-None-Match": async_get(url)["ETag"]})
+        assert response.status_code == 304, (
+            f"Убедитесь, что асинхронная страница `{url}` отвечает 304 "
+            "Not Modified на запрос с актуальным ETag."
+        )
+
+
+def test_async_category_etag_follows_sidebar(published_category):
+    sidebar, _ = Category.objects.update_or_create(
+        slug="news", defaults={"title": "Новости", "is_published": True})
+    url = f"/category/{published_category.slug}/"
+    etag = async_get(url)["ETag"]
+    sidebar.is_published = False
+    sidebar.save()
+    response = async_get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag асинхронной страницы категории меняется при"
+        " изменении категорий боковой панели."
+    )
+
+
+def get_query_count(get, url):
+    for cache in caches.all():
+        cache.clear()
+    return get(url)["X-Query-Count"]
+
+
+def test_async_views_record_pool_queries(settings, read_urls, client):
+    settings.DEBUG = True
+    for urls in read_urls.values():
+        assert (
+            get_query_count(async_get, urls[0])
+            == get_query_count(client.get, urls[0])
+        ), (
+            "Убедитесь, что запросы асинхронных представлений из пула "
+            "потоков попадают в учёт запросов страницы."
+        )
+
+
+def test_asgi_records_sync_view_queries(user, user_client):
+    for url in ("/search/?q=p", "/posts/create/", "/edit_profile/"):
+        for cache in caches.all():
+            cache.clear()
+        response = async_get(url, user)
+        assert response.status_code == 200
+        for cache in caches.all():
+            cache.clear()
+        expected = user_client.get(url).wsgi_request.query_stats.count
+        assert response.asgi_request.query_stats.count == expected > 0, (
+            f"Убедитесь, что под ASGI учитываются запросы синхронного"
+            f" представления `{url}`, выполняемого в другом потоке."
+        )
+
+
+def test_run_db_in_pool_with_caller_context():
+    variable = ContextVar("variable", default=None)
+
+    def work():
+        Post = post_published_query().model
+        Post.objects.exists()
+        return threading.current_thread().name, variable.get()
+
+    async def run():
+        variable.set("caller")
+        with QueryRecorder() as recorder:
+            result = await run_db(work)
+        return result, recorder.count
+
+    (thread_name, value), count = async_to_sync(run)()
+    assert thread_name.startswith("db"), (
+        "Убедитесь, что run_db выполняет функцию в пуле потоков базы."
+    )
+    assert value == "caller"
+    assert count >= 1
+
+
+@pytest.mark.parametrize("number", ["1", "2", "100", "0", "x", None])
+def test_aget_page_matches_get_page(
+        rf, number, many_posts_with_published_locations):
+    request = rf.get("/", {} if number is None else {"page": number})
+    queryset = post_published_query()
+    expected = get_page(request, queryset)
+    page = async_to_sync(aget_page)(request, queryset)
+    assert page.number == expected.number
+    assert list(page) == list(expected)
+    for name in ("next_cursor", "previous_cursor"):
+        assert getattr(page, name, None) == getattr(expected, name, None)
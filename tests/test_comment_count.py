@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_create_and_delete(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        another_user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что добавление комментария увеличивает"
+        " `Post.comment_count`."
+    )
+
+    comment = post.comments.first()
+    another_user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что удаление комментария уменьшает"
+        " `Post.comment_count`."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command("recount_comments")
+
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+def test_feed_query_has_no_comment_join():
+    from core.utils import post_published_query
+
+    sql = str(post_published_query().query)
+    assert "blog_comment" not in sql
+    assert "GROUP BY" not in sql
+
+
+def test_loaddata_keeps_comment_count(
+        tmp_path, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    fixture = tmp_path / "comments.json"
+    call_command(
+        "dumpdata", "blog.Post", "blog.Comment", output=str(fixture))
+    post_model, post_id = type(post), post.pk
+    post.delete()
+
+    call_command("loaddata", str(fixture), verbosity=0)
+
+    assert post_model.objects.get(pk=post_id).comment_count == 2, (
+        "Убедитесь, что загрузка комментариев из фикстуры не меняет"
+        " `Post.comment_count`, загруженный вместе с постом."
+    )
@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import CommentNotification
+from blog.notifications import send_pending_notifications
+
+pytestmark = [pytest.mark.django_db]
+
+
+class CountingBackend(EmailBackend):
+    """Бэкенд в памяти, считающий открытые соединения."""
+
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("почтовый сервер недоступен")
+
+
+class UnreachableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("соединение отклонено")
+
+
+def _comment(client, post, text="Комментарий"):
+    return client.post(f"/posts/{post.id}/comment/", data={"text": text})
+
+
+def _expire_window():
+    CommentNotification.objects.update(send_after=timezone.now())
+
+
+def test_comment_queues_notification_without_sending(
+        another_user_client, post_with_published_location
+):
+    response = _comment(another_user_client, post_with_published_location)
+    assert response.status_code == 302
+    assert mail.outbox == [], (
+        "Убедитесь, что письмо автору поста не отправляется во время"
+        " обработки запроса."
+    )
+    notification = CommentNotification.objects.get()
+    assert notification.recipient == post_with_published_location.author
+    assert notification.post_url.endswith(
+        f"/posts/{post_with_published_location.id}/")
+    assert send_pending_notifications() == 0, (
+        "Убедитесь, что письмо ждёт окончания окна дайджеста."
+    )
+
+
+def test_own_comment_not_notified(user_client, post_with_published_location):
+    _comment(user_client, post_with_published_location)
+    assert not CommentNotification.objects.exists()
+
+
+def test_single_comment_email(
+        another_user_client, post_with_published_location
+):
+    _comment(another_user_client, post_with_published_location)
+    _expire_window()
+    assert send_pending_notifications() == 1
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject == "New comment"
+    assert mail.outbox[0].to == [post_with_published_location.author.email]
+    assert CommentNotification.objects.get().status == (
+        CommentNotification.SENT)
+    assert send_pending_notifications() == 0
+
+
+def test_comments_coalesced_into_digest(
+        settings, another_user_client, user_client, mixer,
+        post_with_published_location
+):
+    settings.EMAIL_BACKEND = f"{__name__}.CountingBackend"
+    CountingBackend.opened = 0
+    other_post = mixer.blend(
+        "blog.Post", author=post_with_published_location.author)
+    for text in ("Первый", "Второй", "Третий"):
+        _comment(another_user_client, post_with_published_location, text)
+    _comment(another_user_client, other_post)
+    _comment(user_client, post_with_published_location)
+    _expire_window()
+
+    assert send_pending_notifications() == 2
+    assert len(mail.outbox) == 2, (
+        "Убедитесь, что комментарии к одному посту, добавленные в окне"
+        " дайджеста, отправляются одним письмом."
+    )
+    digest = next(m for m in mail.outbox if m.subject == "New comments")
+    assert "комментариев: 3" in digest.body
+    assert all(text in digest.body for text in ("Первый", "Второй", "Третий"))
+    assert CountingBackend.opened == 1, (
+        "Убедитесь, что все письма отправляются через одно соединение."
+    )
+
+
+def test_failed_send_retried_with_backoff(
+        settings, another_user_client, post_with_published_location
+):
+    settings.EMAIL_BACKEND = f"{__name__}.FailingBackend"
+    settings.NOTIFICATION_MAX_ATTEMPTS = 2
+    _comment(another_user_client, post_with_published_location)
+    _expire_window()
+
+    assert send_pending_notifications() == 0
+    notification = CommentNotification.objects.get()
+    assert notification.status == CommentNotification.PENDING
+    assert notification.attempts == 1
+    assert "почтовый сервер недоступен" in notification.last_error
+    assert notification.send_after > timezone.now() + timedelta(seconds=30)
+
+    _expire_window()
+    send_pending_notifications()
+    notification.refresh_from_db()
+    assert notification.status == CommentNotification.FAILED
+
+
+def test_unreachable_server_retried_with_backoff(
+        settings, another_user_client, post_with_published_location
+):
+    settings.EMAIL_BACKEND = f"{__name__}.UnreachableBackend"
+    _comment(another_user_client, post_with_published_location)
+    _expire_window()
+
+    assert send_pending_notifications() == 0
+    notification = CommentNotification.objects.get()
+    assert notification.status == CommentNotification.PENDING
+    assert notification.attempts == 1, (
+        "Убедитесь, что ошибка соединения с почтовым сервером считается "
+        "неудачной попыткой отправки."
+    )
+    assert "соединение отклонено" in notification.last_error
+    assert notification.send_after > timezone.now()
+
+
+def test_command_loop_survives_errors(
+        monkeypatch, another_user_client, post_with_published_location):
+    calls = []
+
+    def send(limit):
+        calls.append(limit)
+        if len(calls) == 1:
+            raise ConnectionRefusedError("соединение отклонено")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(
+        "blog.management.commands.send_comment_notifications"
+        ".send_pending_notifications", send)
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    with pytest.raises(KeyboardInterrupt):
+        call_command("send_comment_notifications", "--loop")
+    assert len(calls) == 2, (
+        "Убедитесь, что `send_comment_notifications --loop` продолжает "
+        "работу после ошибки."
+    )
+
+
+def test_send_comment_notifications_command(
+        another_user_client, post_with_published_location
+):
+    _comment(another_user_client, post_with_published_location)
+    _expire_window()
+    call_command("send_comment_notifications")
+    assert len(mail.outbox) == 1
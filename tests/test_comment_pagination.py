@@ -0,0 +1,53 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(45).blend(
+        "blog.Comment",
+        post=post_with_published_location,
+        text=mixer.sequence(lambda i: f"Комментарий номер {i:03d}"),
+    )
+
+
+def test_comments_are_loaded_in_batches(
+        user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    response = user_client.get(f"/posts/{post.id}/")
+    first_batch = list(response.context["comments"])
+    assert first_batch == many_comments[:20], (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев, «от старых к новым»."
+    )
+    assert many_comments[20].text not in response.content.decode("utf-8")
+
+    seen = list(first_batch)
+    comments = response.context["comments"]
+    while comments.has_next():
+        response = user_client.get(
+            f"/posts/{post.id}/comments/", {"cursor": comments.next_cursor})
+        assert response.status_code == 200
+        comments = response.context["comments"]
+        content = response.content.decode("utf-8")
+        assert "<html" not in content, (
+            "Убедитесь, что следующая порция комментариев отдаётся"
+            " фрагментом без обёртки страницы."
+        )
+        for comment in comments:
+            assert comment.text in content
+        seen.extend(comments)
+    assert seen == many_comments
+
+
+def test_comment_fragment_respects_visibility(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/comments/"
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
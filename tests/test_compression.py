@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+
+from core import middleware
+from core.middleware import CompressionMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _compress(rf, response, **headers):
+    request = rf.get("/", HTTP_ACCEPT_ENCODING="gzip", **headers)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def test_feed_page_compressed(client, many_posts_with_published_locations):
+    plain = client.get("/")
+    assert not plain.has_header("Content-Encoding")
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что HTML-страницы сжимаются для клиентов, "
+        "принимающих gzip."
+    )
+    assert "Accept-Encoding" in response["Vary"]
+    assert gzip.decompress(response.content) == plain.content
+    assert response["Content-Length"] == str(len(response.content))
+
+
+def test_cached_feed_page_reuses_compressed_body(
+        client, monkeypatch, many_posts_with_published_locations):
+    calls = []
+
+    def compress_bytes(data, encoding):
+        calls.append(encoding)
+        return gzip.compress(data)
+
+    monkeypatch.setattr(middleware, "compress_bytes", compress_bytes)
+    first = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    second = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert second.content == first.content
+    assert calls == ["gzip"], (
+        "Убедитесь, что сжатое тело закэшированной страницы ленты берётся "
+        "из кэша, а не сжимается заново."
+    )
+
+
+def test_streaming_response_compressed(rf):
+    chunks = [b"a" * 300, b"b" * 300, b"c" * 300]
+    response = _compress(
+        rf, StreamingHttpResponse(iter(chunks), content_type="text/plain"))
+    assert response["Content-Encoding"] == "gzip"
+    compressed = list(response.streaming_content)
+    assert len(compressed) > 1, (
+        "Убедитесь, что потоковый ответ сжимается по частям."
+    )
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
+
+
+def test_etag_becomes_weak(rf):
+    response = HttpResponse("x" * 1000)
+    response["ETag"] = '"abc"'
+    assert _compress(rf, response)["ETag"] == 'W/"abc"'
+
+
+@pytest.mark.parametrize("response", [
+    HttpResponse("x" * 10),
+    HttpResponse(b"\x89PNG" * 500, content_type="image/png"),
+    HttpResponse("x" * 1000, headers={"Content-Encoding": "gzip"}),
+])
+def test_not_compressed(rf, response):
+    content = response.content
+    response = _compress(rf, response)
+    assert response.content == content
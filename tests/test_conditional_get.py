@@ -0,0 +1,147 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_urls(user, published_category, post_with_published_location):
+    return [
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post_with_published_location.id}/",
+    ]
+
+
+def test_unchanged_pages_return_not_modified(
+        page_urls, user_client, unlogged_client
+):
+    for client in (user_client, unlogged_client):
+        for url in page_urls:
+            response = client.get(url)
+            assert response.status_code == 200
+            etag = response["ETag"]
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f"Убедитесь, что страница `{url}` отвечает 304 Not Modified,"
+                " если её ETag не изменился."
+            )
+            assert not response.content
+
+
+def test_last_modified_only_for_anonymous(page_urls, user_client, client):
+    for url in page_urls:
+        response = client.get(url)
+        assert response.has_header("Last-Modified")
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        assert response.status_code == 304
+        assert not user_client.get(url).has_header("Last-Modified")
+
+
+def test_etag_depends_on_user(page_urls, user_client, another_user_client):
+    for url in page_urls:
+        assert (
+            user_client.get(url)["ETag"]
+            != another_user_client.get(url)["ETag"]
+        )
+
+
+def test_etag_changes_with_comments_and_visibility(
+        mixer, page_urls, user_client, another_user_client,
+        post_with_published_location
+):
+    etags = {url: user_client.get(url)["ETag"] for url in page_urls}
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    for url in page_urls:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что ETag страницы `{url}` меняется при добавлении"
+            " комментария."
+        )
+
+    url = page_urls[-1]
+    etag = another_user_client.get(url)["ETag"]
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 404
+
+
+def test_etag_changes_with_profile(user, user_client, another_user_client):
+    url = f"/profile/{user.username}/"
+    etags = {
+        client: client.get(url)["ETag"]
+        for client in (user_client, another_user_client)
+    }
+    response = user_client.post("/edit_profile/", data={
+        "first_name": "Новое",
+        "last_name": "Имя",
+        "username": user.username,
+        "email": "new@example.com",
+    })
+    assert response.status_code == 302
+    for client, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что ETag страницы профиля меняется при изменении "
+            "профиля."
+        )
+        assert "Новое Имя" in response.content.decode()
+
+
+def test_etag_changes_with_empty_category(mixer, client):
+    category = mixer.blend("blog.Category", is_published=True)
+    url = f"/category/{category.slug}/"
+    etag = client.get(url)["ETag"]
+    category.title = "Новое название"
+    category.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы категории меняется при изменении "
+        "категории, даже если в ней нет постов."
+    )
+    etag = response["ETag"]
+    category.is_published = False
+    category.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+def test_etag_changes_with_sidebar_category(mixer, client):
+    category = mixer.blend("blog.Category", is_published=True)
+    sidebar, _ = Category.objects.update_or_create(
+        slug="news", defaults={"title": "Новости", "is_published": True})
+    url = f"/category/{category.slug}/"
+    response = client.get(url)
+    assert sidebar.title in response.content.decode()
+    sidebar.is_published = False
+    sidebar.save()
+    response = client.get(
+        url,
+        HTTP_IF_NONE_MATCH=response["ETag"],
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag и Last-Modified страницы категории меняются"
+        " при изменении категорий боковой панели."
+    )
+    assert sidebar.title not in response.content.decode()
+
+
+def test_validator_state_cached(
+        user_client, page_urls, many_posts_with_published_locations):
+    for url in page_urls:
+        user_client.get(url)
+    for url in [*page_urls, "/?page=2"]:
+        with CaptureQueriesContext(connection) as queries:
+            assert user_client.get(url).status_code == 200
+        assert not any(
+            "MAX(" in query["sql"] for query in queries.captured_queries
+        ), (
+            f"Убедитесь, что состояние постов для ETag страницы `{url}` "
+            "берётся из кэша ленты."
+        )
@@ -0,0 +1,206 @@
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import get_feed_version
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        query["sql"] for query in queries.captured_queries
+        if "COUNT(*)" in query["sql"]
+    ]
+
+
+def test_feed_count_is_cached(
+        user_client, many_posts_with_published_locations
+):
+    _, first = _count_queries(user_client, "/?page=2")
+    response, second = _count_queries(user_client, "/?page=2")
+    assert len(first) == 1
+    assert not second, (
+        "Убедитесь, что число постов ленты берётся из кэша при повторном"
+        " запросе."
+    )
+    assert response.context["page_obj"].paginator.count == len(
+        many_posts_with_published_locations)
+
+
+def test_feed_count_invalidated_on_post_changes(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    user_client.get("/")
+    post = posts[0]
+    post.is_published = False
+    post.save()
+    response = user_client.get("/")
+    assert response.context["page_obj"].paginator.count == len(posts) - 1, (
+        "Убедитесь, что кэш числа постов сбрасывается при изменении поста."
+    )
+
+    posts[1].delete()
+    response = user_client.get("/")
+    assert response.context["page_obj"].paginator.count == len(posts) - 2
+
+
+def test_feed_count_invalidated_on_category_toggle(
+        user_client, published_category, many_posts_with_published_locations
+):
+    url = f"/category/{published_category.slug}/"
+    assert user_client.get("/").context["page_obj"].paginator.count
+    user_client.get(url)
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(url).status_code == 404
+    assert user_client.get("/").context["page_obj"].paginator.count == 0
+
+
+def test_feed_caches_invalidated_on_bulk_update(
+        user_client, published_category, many_posts_with_published_locations
+):
+    from blog.models import Category
+
+    response = user_client.get("/")
+    assert response.context["page_obj"].paginator.count
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False)
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert response.context["page_obj"].paginator.count == 0, (
+        "Убедитесь, что массовое изменение через QuerySet.update()"
+        " сбрасывает кэши лент."
+    )
+
+
+def _post_titles(response):
+    return response.content.decode("utf-8")
+
+
+def test_anonymous_index_page_is_cached(
+        client, many_posts_with_published_locations
+):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert not queries.captured_queries, (
+        "Убедитесь, что повторный анонимный запрос главной страницы"
+        " отдаётся из кэша без запросов к базе."
+    )
+
+
+def test_anonymous_index_cache_invalidated(
+        client, mixer, user, many_posts_with_published_locations
+):
+    post = client.get("/").context["page_obj"][0]
+
+    post.title = "Совершенно новый заголовок"
+    post.save()
+    assert post.title in _post_titles(client.get("/"))
+
+    mixer.blend("blog.Comment", post=post)
+    content = _post_titles(client.get("/"))
+    assert "Комментарии\n        (1)" in content, (
+        "Убедитесь, что кэш страницы сбрасывается при изменении числа"
+        " комментариев."
+    )
+
+    post.location.is_published = False
+    post.location.save()
+    assert client.get("/").content.decode("utf-8").count(
+        post.location.name) == 0
+
+
+def test_feed_cache_expires_at_next_publication(mixer, user):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from core.utils import feed_cache_timeout
+
+    assert feed_cache_timeout(60) == 60
+    mixer.blend(
+        "blog.Post", author=user,
+        pub_date=timezone.now() + timedelta(seconds=20),
+    )
+    assert 0 < feed_cache_timeout(60) <= 20, (
+        "Убедитесь, что кэш ленты истекает к моменту отложенной публикации."
+    )
+
+
+def test_scheduled_post_goes_live(user_client, mixer, user, published_category):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert not post.is_live
+    assert not list(user_client.get("/").context["page_obj"])
+
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    call_command("publish_scheduled")
+    post.refresh_from_db()
+    assert post.is_live, (
+        "Убедитесь, что команда publish_scheduled переводит в ленту посты с"
+        " наступившей датой публикации."
+    )
+    assert list(user_client.get("/").context["page_obj"]) == [post]
+
+
+def test_due_post_appears_without_worker(
+        user_client, mixer, user, published_category
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    user_client.get("/")
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    from core.cache import invalidate_feeds
+
+    invalidate_feeds()
+    assert list(user_client.get("/").context["page_obj"]) == [post], (
+        "Убедитесь, что наступившие публикации попадают в ленту и без"
+        " фонового процесса."
+    )
+
+
+def test_feed_version_shared_between_processes():
+    version = get_feed_version()
+    # Другой процесс сервера сбрасывает кэши лент после изменения поста.
+    # Каталог кэша тестов передаётся ему вместо каталога из настроек.
+    subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys, django; from django.conf import settings; "
+            "settings.CACHES['default']['LOCATION'] = sys.argv[1]; "
+            "django.setup(); "
+            "from core.cache import invalidate_feeds; invalidate_feeds()",
+            settings.CACHES["default"]["LOCATION"],
+        ],
+        cwd=settings.BASE_DIR,
+        check=True,
+    )
+    assert get_feed_version() != version, (
+        "Убедитесь, что кэш лент общий для всех процессов сервера и "
+        "сброс версии лент в одном процессе виден в остальных."
+    )
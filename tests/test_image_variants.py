@@ -0,0 +1,113 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from core.jobs import run_jobs
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _image_file(width, height, name="photo.jpg"):
+    data = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(data, "JPEG")
+    return ImageFile(data, name=name)
+
+
+@pytest.fixture
+def post_with_large_image(
+        mixer, media_root, user, published_location, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        is_published=True,
+        location=published_location,
+        category=published_category,
+        author=user,
+        image=_image_file(1600, 800),
+    )
+    run_jobs()
+    post.refresh_from_db()
+    return post
+
+
+def test_variants_built_on_upload(post_with_large_image, media_root):
+    variants = post_with_large_image.image_variants
+    assert [v["width"] for v in variants["jpeg"]] == [320, 640, 1280], (
+        "Убедитесь, что при загрузке изображения создаются уменьшенные копии."
+    )
+    assert [v["width"] for v in variants["webp"]] == [320, 640, 1280]
+    for variant in variants["jpeg"] + variants["webp"]:
+        assert variant["height"] == variant["width"] // 2
+        with Image.open(media_root / variant["name"]) as image:
+            assert image.size == (variant["width"], variant["height"])
+
+
+def test_small_image_recompressed_once(mixer, media_root):
+    post = mixer.blend("blog.Post", image=_image_file(100, 50))
+    run_jobs()
+    post.refresh_from_db()
+    assert [v["width"] for v in post.image_variants["jpeg"]] == [100]
+
+
+def test_clearing_image_drops_variants(post_with_large_image):
+    post_with_large_image.image = None
+    post_with_large_image.save()
+    assert post_with_large_image.image_variants == {}
+
+
+def test_upload_falls_back_to_original_until_processed(
+        user_client, mixer, media_root, published_category
+):
+    post = mixer.blend(
+        "blog.Post", is_published=True, category=published_category,
+        image=_image_file(1600, 800),
+    )
+    assert post.image_variants == {}
+    soup = BeautifulSoup(user_client.get("/").content, "html.parser")
+    assert not soup.find("picture")
+    assert soup.find("img", src=post.image.url), (
+        "Убедитесь, что до обработки изображения в ленте выводится оригинал."
+    )
+
+    post.image = _image_file(800, 400, name="other.jpg")
+    post.save()
+    run_jobs()
+    post.refresh_from_db()
+    assert post.image_variants["jpeg"][-1]["width"] == 800, (
+        "Убедитесь, что задача для заменённого изображения не перезаписывает"
+        " варианты нового."
+    )
+
+
+def test_feed_uses_srcset(user_client, post_with_large_image):
+    soup = BeautifulSoup(user_client.get("/").content, "html.parser")
+    pictures = soup.find_all("picture")
+    assert len(pictures) == 1
+    source = pictures[0].find("source")
+    img = pictures[0].find("img")
+    assert source["type"] == "image/webp"
+    assert source["srcset"].count("w,") == 2
+    assert "1280w" in img["srcset"]
+    assert img["src"] != post_with_large_image.image.url, (
+        "Убедитесь, что в ленте вместо оригинала выводится уменьшенная копия."
+    )
+    assert img.parent.parent["href"] == post_with_large_image.image.url
+
+
+def test_build_image_variants_command(post_with_large_image):
+    from blog.models import Post
+
+    Post.objects.update(image_variants={})
+    call_command("build_image_variants", "--missing")
+    post_with_large_image.refresh_from_db()
+    assert len(post_with_large_image.image_variants["jpeg"]) == 3
@@ -0,0 +1,71 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _query_plan(sql: str, params) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_uses_indexes(plan: List[str], description: str):
+    for step in plan:
+        if "blog_post" in step or "blog_comment" in step:
+            assert "USING" in step, (
+                f"Убедитесь, что {description} читает таблицу по индексу,"
+                f" а не полным просмотром: {plan}"
+            )
+    assert not any("TEMP B-TREE" in step for step in plan), (
+        f"Убедитесь, что {description} получает порядок сортировки из"
+        f" индекса: {plan}"
+    )
+
+
+@pytest.fixture
+def hot_querysets(user, published_category, post_with_published_location):
+    from blog.models import Comment, Post
+    from core.utils import (
+        decode_cursor, encode_cursor, post_all_query, post_published_query,
+        _keyset_filter, FEED_ORDERING,
+    )
+
+    post = post_with_published_location
+    _, key = decode_cursor(
+        encode_cursor(post, FEED_ORDERING, "next"), Post, FEED_ORDERING)
+    return {
+        "главная лента": post_published_query()[:10],
+        "страница категории": post_published_query().filter(
+            category=published_category)[:10],
+        "профиль автора": post_all_query().filter(author=user)[:10],
+        "профиль для читателя": post_published_query().filter(
+            author=user)[:10],
+        "страница ленты по курсору": post_published_query().filter(
+            _keyset_filter(FEED_ORDERING, key, False))[:10],
+        "страница поста": post_all_query().filter(pk=post.pk),
+        "список комментариев": Comment.objects.filter(
+            post=post).select_related("author"),
+        "поиск отложенных постов": Post.objects.filter(
+            is_live=False).order_by("pub_date").values("pub_date")[:1],
+    }
+
+
+def test_hot_queries_use_indexes(hot_querysets):
+    for description, queryset in hot_querysets.items():
+        sql, params = queryset.query.sql_with_params()
+        _assert_uses_indexes(_query_plan(sql, params), description)
+
+
+def test_feed_count_uses_index(user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get("/?page=1")
+    count_sql = [
+        query["sql"] for query in queries.captured_queries
+        if "COUNT(*)" in query["sql"]
+    ]
+    assert count_sql
+    _assert_uses_indexes(_query_plan(count_sql[0], ()), "подсчёт постов ленты")
@@ -0,0 +1,97 @@
+from concurrent.futures import Future
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.jobs import claim_jobs, enqueue, run_jobs
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+def record_call(*args, **kwargs):
+    CALLS.append((args, kwargs))
+
+
+def fail():
+    raise RuntimeError("сбой задачи")
+
+
+class InlineExecutor:
+    """Исполнитель с интерфейсом Executor, выполняющий задачи сразу."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+@pytest.mark.parametrize("executor", [None, InlineExecutor()])
+def test_jobs_run_once(executor):
+    job = enqueue(f"{__name__}.record_call", 1, "a", flag=True)
+    assert run_jobs(executor=executor) == 1
+    assert CALLS == [((1, "a"), {"flag": True})]
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 1
+    assert run_jobs(executor=executor) == 0, (
+        "Убедитесь, что выполненная задача не запускается повторно."
+    )
+
+
+def test_delayed_job_waits():
+    enqueue(
+        f"{__name__}.record_call",
+        run_after=timezone.now() + timedelta(minutes=5),
+    )
+    assert run_jobs() == 0
+    assert CALLS == []
+
+
+@pytest.mark.parametrize("executor", [None, InlineExecutor()])
+def test_failed_job_retried_with_backoff(settings, executor):
+    settings.JOB_MAX_ATTEMPTS = 2
+    settings.JOB_RETRY_DELAY = 30
+    job = enqueue(f"{__name__}.fail")
+    run_jobs(executor=executor)
+    job.refresh_from_db()
+    assert job.status == Job.PENDING
+    assert "сбой задачи" in job.last_error
+    assert job.run_after > timezone.now() + timedelta(seconds=25), (
+        "Убедитесь, что упавшая задача повторяется после паузы."
+    )
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    run_jobs(executor=executor)
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+def test_claimed_job_not_taken_twice():
+    enqueue(f"{__name__}.record_call")
+    assert len(claim_jobs(10)) == 1
+    assert claim_jobs(10) == [], (
+        "Убедитесь, что задачу, взятую в работу, не берёт другой обработчик."
+    )
+
+
+def test_stale_running_job_reclaimed(settings):
+    job = enqueue(f"{__name__}.record_call")
+    claim_jobs(10)
+    Job.objects.filter(pk=job.pk).update(
+        locked_at=timezone.now()
+        - timedelta(seconds=settings.JOB_LOCK_TIMEOUT + 1))
+    assert run_jobs() == 1
+    assert len(CALLS) == 1
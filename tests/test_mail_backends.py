@@ -0,0 +1,126 @@
+import mailbox
+
+import pytest
+from django.core.mail import EmailMessage, get_connection
+
+from core.mail import PooledSMTPEmailBackend, smtp_pool
+
+
+def _message(body="Текст письма", subject="Тема"):
+    return EmailMessage(
+        subject, body, "from@example.com", ["to@example.com"])
+
+
+@pytest.fixture
+def mbox_backend(settings, tmp_path):
+    settings.EMAIL_BACKEND = "core.mail.MboxEmailBackend"
+    settings.EMAIL_FILE_PATH = tmp_path
+    return tmp_path
+
+
+def _read_mbox(path):
+    messages = []
+    for filename in sorted(path.glob("*.mbox")):
+        messages.extend(mailbox.mbox(filename))
+    return messages
+
+
+def test_mbox_appends_messages_to_one_file(mbox_backend):
+    connection = get_connection()
+    connection.send_messages([_message("Первое"), _message("Второе")])
+    connection.send_messages([_message("From the start\nТретье")])
+    files = list(mbox_backend.glob("*.mbox"))
+    assert len(files) == 1, (
+        "Убедитесь, что письма дописываются в один файл, а не создают"
+        " файл на каждую отправку."
+    )
+    messages = _read_mbox(mbox_backend)
+    assert len(messages) == 3
+    body = messages[2].get_payload(decode=True).decode()
+    assert ">From the start" in body
+
+
+def test_mbox_buffers_while_connection_open(mbox_backend):
+    with get_connection() as connection:
+        connection.send_messages([_message()])
+        connection.send_messages([_message()])
+        assert _read_mbox(mbox_backend) == [], (
+            "Убедитесь, что при открытом соединении письма копятся в памяти."
+        )
+    assert len(_read_mbox(mbox_backend)) == 2
+
+
+def test_mbox_flushes_full_batch(settings, mbox_backend):
+    settings.EMAIL_MBOX_BATCH_SIZE = 2
+    with get_connection() as connection:
+        connection.send_messages([_message(), _message()])
+        assert len(_read_mbox(mbox_backend)) == 2
+
+
+def test_mbox_rotates_large_files(settings, mbox_backend):
+    settings.EMAIL_MBOX_MAX_BYTES = 1000
+    connection = get_connection()
+    for _ in range(3):
+        connection.send_messages([_message("x" * 600)])
+    assert len(list(mbox_backend.glob("*.mbox"))) == 3
+    assert len(_read_mbox(mbox_backend)) == 3
+
+
+class FakeSMTP:
+    """Заглушка smtplib.SMTP, считающая открытые соединения."""
+
+    created = []
+
+    def __init__(self, host, port, **kwargs):
+        self.sent = []
+        self.alive = True
+        self.quit_called = False
+        FakeSMTP.created.append(self)
+
+    def sendmail(self, from_email, recipients, message):
+        self.sent.append(message)
+
+    def noop(self):
+        return (250, b"OK") if self.alive else (421, b"closed")
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_smtp(settings, monkeypatch):
+    settings.EMAIL_BACKEND = "core.mail.PooledSMTPEmailBackend"
+    monkeypatch.setattr(
+        PooledSMTPEmailBackend, "connection_class", FakeSMTP)
+    FakeSMTP.created = []
+    smtp_pool.clear()
+    yield FakeSMTP
+    smtp_pool.clear()
+
+
+def test_pooled_smtp_reuses_connection(fake_smtp):
+    for _ in range(3):
+        assert get_connection().send_messages([_message()]) == 1
+    assert len(fake_smtp.created) == 1, (
+        "Убедитесь, что SMTP-соединение переиспользуется между отправками."
+    )
+    assert len(fake_smtp.created[0].sent) == 3
+    assert not fake_smtp.created[0].quit_called
+
+
+def test_pooled_smtp_replaces_dead_connection(fake_smtp):
+    get_connection().send_messages([_message()])
+    fake_smtp.created[0].alive = False
+    get_connection().send_messages([_message()])
+    assert len(fake_smtp.created) == 2
+    assert fake_smtp.created[0].quit_called
+
+
+def test_pooled_smtp_drops_idle_connection(settings, fake_smtp):
+    settings.EMAIL_POOL_MAX_IDLE = -1
+    get_connection().send_messages([_message()])
+    get_connection().send_messages([_message()])
+    assert len(fake_smtp.created) == 2
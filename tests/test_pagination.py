@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    response = client.get(url, {"cursor": ""})
+    pages = [list(response.context["page_obj"])]
+    page_obj = response.context["page_obj"]
+    while page_obj.has_next():
+        response = client.get(url, {"cursor": page_obj.next_cursor})
+        page_obj = response.context["page_obj"]
+        pages.append(list(page_obj))
+    return pages, page_obj
+
+
+def test_cursor_pagination_walks_whole_feed(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    pages, last_page = _walk_cursor_pages(user_client, "/")
+    walked = [post for page in pages for post in page]
+    assert len(walked) == len(posts), (
+        "Убедитесь, что переход по курсорам проходит всю ленту без пропусков"
+        " и повторов."
+    )
+    assert len(set(post.id for post in walked)) == len(posts)
+    keys = [(post.pub_date, post.id) for post in walked]
+    assert keys == sorted(keys, reverse=True), (
+        "Убедитесь, что курсорная пагинация сохраняет порядок «от новых к"
+        " старым»."
+    )
+
+    response = user_client.get("/", {"cursor": last_page.previous_cursor})
+    assert list(response.context["page_obj"]) == pages[-2], (
+        "Убедитесь, что курсор предыдущей страницы возвращает на неё."
+    )
+
+
+def test_cursor_page_skips_count_and_offset(
+        user_client, many_posts_with_published_locations
+):
+    first_page = user_client.get("/", {"cursor": ""}).context["page_obj"]
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get("/", {"cursor": first_page.next_cursor})
+    feed_sql = [
+        query["sql"] for query in queries.captured_queries
+        if "blog_post" in query["sql"]
+    ]
+    assert feed_sql
+    assert not any("COUNT(*)" in sql for sql in feed_sql)
+    assert not any("OFFSET" in sql for sql in feed_sql)
+
+
+def test_broken_cursor_returns_first_page(
+        user_client, many_posts_with_published_locations
+):
+    first_page = list(user_client.get("/").context["page_obj"])
+    response = user_client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == 200
+    assert list(response.context["page_obj"]) == first_page
+
+
+def test_numbered_pages_link_by_number(
+        user_client, many_posts_with_published_locations
+):
+    for number, neighbour in ((1, 2), (2, 1)):
+        content = user_client.get("/", {"page": number}).content.decode()
+        assert f'href="?page={neighbour}"' in content
+        assert "cursor=" not in content, (
+            "Убедитесь, что страница, запрошенная по номеру, ссылается на"
+            " соседние страницы по номерам, а не по курсорам."
+        )
+    content = user_client.get("/", {"cursor": ""}).content.decode()
+    assert "cursor=" in content
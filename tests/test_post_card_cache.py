@@ -0,0 +1,65 @@
+import pytest
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _card_key(post):
+    post.refresh_from_db()
+    return make_template_fragment_key(
+        "post_card", [post.id, post.card_version])
+
+
+def test_feeds_share_cached_post_card(
+        client, user_client, post_with_published_location):
+    post = post_with_published_location
+    fragments = caches["template_fragments"]
+    client.get("/")
+    key = _card_key(post)
+    assert fragments.get(key), (
+        "Убедитесь, что карточка поста кэшируется при отрисовке ленты."
+    )
+    fragments.set(key, "<p>карточка из кэша</p>", None)
+    for url in (
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        content = user_client.get(url).content.decode()
+        assert "карточка из кэша" in content, (
+            f"Убедитесь, что страница `{url}` берёт карточку поста из кэша."
+        )
+
+
+def test_post_card_version_changes(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    versions = {_card_key(post)}
+
+    mixer.blend("blog.Comment", post=post)
+    versions.add(_card_key(post))
+
+    post.category.is_published = False
+    post.category.save()
+    versions.add(_card_key(post))
+
+    post.location.name = "Новое место"
+    post.location.save()
+    versions.add(_card_key(post))
+
+    post.author.username = "renamed"
+    post.author.save()
+    versions.add(_card_key(post))
+
+    assert len(versions) == 5, (
+        "Убедитесь, что версия карточки меняется вместе с постом, его "
+        "категорией, местоположением, автором и числом комментариев."
+    )
+
+
+def test_updated_card_rendered(client, post_with_published_location):
+    post = post_with_published_location
+    client.get("/")
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert "Обновлённый заголовок" in client.get("/").content.decode()
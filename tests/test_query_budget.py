@@ -0,0 +1,125 @@
+import pytest
+from django.test import override_settings
+from django.urls import URLPattern
+
+from conftest import get_response_within_query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", author=user, post=post_with_published_location)
+
+
+@pytest.fixture
+def blog_urls(user, published_category, post_with_published_location,
+              own_comment):
+    post_id = post_with_published_location.id
+    comment_id = own_comment.id
+    return {
+        "index": ["/", "/?page=2"],
+        "category_posts": [f"/category/{published_category.slug}/"],
+        "profile": [f"/profile/{user.username}/"],
+        "search": [
+            "/search/",
+            f"/search/?q={post_with_published_location.title.split()[0]}",
+            "/search/?q=a&page=2",
+        ],
+        "post_detail": [f"/posts/{post_id}/"],
+        "comments": [f"/posts/{post_id}/comments/"],
+        "edit_profile": ["/edit_profile/"],
+        "create_post": ["/posts/create/"],
+        "edit_post": [f"/posts/{post_id}/edit/"],
+        "delete_post": [f"/posts/{post_id}/delete/"],
+        "add_comment": [f"/posts/{post_id}/comment/"],
+        "edit_comment": [f"/posts/{post_id}/edit_comment/{comment_id}/"],
+        "delete_comment": [f"/posts/{post_id}/delete_comment/{comment_id}/"],
+    }
+
+
+def test_every_blog_url_has_budget():
+    from blog.urls import query_budgets, urlpatterns
+
+    names = {
+        pattern.name for pattern in urlpatterns
+        if isinstance(pattern, URLPattern)
+    }
+    assert names == set(query_budgets), (
+        "Убедитесь, что для каждого адреса из `blog/urls.py` объявлен"
+        " бюджет SQL-запросов в `query_budgets`."
+    )
+
+
+def test_get_requests_within_budget(
+        blog_urls, user_client, another_user_client, unlogged_client,
+        many_posts_with_published_locations
+):
+    for client in (user_client, another_user_client, unlogged_client):
+        for urls in blog_urls.values():
+            for url in urls:
+                get_response_within_query_budget(client, url)
+
+
+def test_comment_requests_within_budget(
+        blog_urls, user_client, another_user_client
+):
+    get_response_within_query_budget(
+        another_user_client, blog_urls["add_comment"][0], "post",
+        data={"text": "Комментарий"},
+    )
+    get_response_within_query_budget(
+        user_client, blog_urls["edit_comment"][0], "post",
+        data={"text": "Исправленный комментарий"},
+    )
+    get_response_within_query_budget(
+        user_client, blog_urls["delete_comment"][0], "post")
+
+
+def test_debug_headers(user_client):
+    with override_settings(DEBUG=True):
+        response = user_client.get("/")
+    assert int(response["X-Query-Count"]) == (
+        response.wsgi_request.query_stats.count)
+    assert "X-Query-Time" in response
+    assert response["X-Query-Budget"] == "6"
+
+
+def test_queries_not_recorded_by_default(settings, client):
+    settings.QUERY_STATS = False
+    response = client.get("/")
+    assert response.wsgi_request.query_stats is None, (
+        "Убедитесь, что без DEBUG и QUERY_STATS запросы к базе не"
+        " записываются."
+    )
+    assert "X-Query-Count" not in response
+
+
+@pytest.mark.parametrize("is_published", [True, False])
+def test_post_detail_query_count(
+        mixer, user_client, another_user_client, unlogged_client,
+        post_with_published_location, is_published
+):
+    post = post_with_published_location
+    post.is_published = is_published
+    post.save()
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    url = f"/posts/{post.id}/"
+    expected = (
+        (user_client, 4, 200),
+        (another_user_client, 4, 200 if is_published else 404),
+        (unlogged_client, 2, 200 if is_published else 404),
+    )
+    for client, n_queries, status in expected:
+        client.get(url)
+        response = client.get(url)
+        assert response.status_code == status
+        if status != 200:
+            continue
+        assert response.wsgi_request.query_stats.count == n_queries, (
+            "Убедитесь, что страница поста загружает пост со связанными"
+            " объектами одним запросом, а комментарии — ещё одним; состояние"
+            " для ETag при повторном запросе берётся из кэша."
+        )
+        assert len(response.context["comments"]) == 5
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from django.db import router
+
+from blog.models import Post
+from core.db import ReplicaRouter, reading_from_replicas
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica_reads(settings, monkeypatch):
+    """Считать реплику псевдонимом основной базы и записывать её выбор."""
+    settings.DATABASE_REPLICAS = ["default"]
+    chosen = []
+
+    def choice(replicas):
+        chosen.append(replicas[0])
+        return replicas[0]
+
+    monkeypatch.setattr("core.db.random", SimpleNamespace(choice=choice))
+    return chosen
+
+
+def test_router_sends_only_marked_reads_to_replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    replica_router = ReplicaRouter()
+    assert replica_router.db_for_read(Post) == "default"
+    with reading_from_replicas():
+        assert replica_router.db_for_read(Post) == "replica"
+        assert replica_router.db_for_write(Post) == "default", (
+            "Убедитесь, что запись всегда идёт в основную базу."
+        )
+    assert replica_router.db_for_read(Post) == "default"
+    assert replica_router.allow_migrate("replica", "blog") is False
+    assert replica_router.allow_migrate("default", "blog") is None
+
+
+def test_router_without_replicas_reads_primary():
+    with reading_from_replicas():
+        assert router.db_for_read(Post) == "default"
+
+
+@pytest.mark.parametrize("url", ["/", "/pages/about/"])
+def test_read_only_views_use_replicas(replica_reads, user_client, url):
+    assert user_client.get(url).status_code == 200
+    assert replica_reads, (
+        f"Убедитесь, что страница `{url}` читает данные из реплики."
+    )
+
+
+def test_writes_pin_author_to_primary(
+        replica_reads, user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.post(f"{url}comment/", {"text": "Комментарий"})
+    assert response.status_code == 302
+    assert response.cookies["read_primary"]["max-age"] == 10
+    replica_reads.clear()
+    assert user_client.get(url).status_code == 200
+    assert not replica_reads, (
+        "Убедитесь, что после изменения данных пользователь читает "
+        "из основной базы."
+    )
+
+
+def test_edit_views_read_primary(replica_reads, user_client):
+    assert user_client.get("/posts/create/").status_code == 200
+    assert not replica_reads
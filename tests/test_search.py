@@ -0,0 +1,206 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, Post, PostSearchTerm
+from blog.search import FTS_TABLE
+from core.jobs import run_jobs
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["fts5", "inverted"])
+def search_backend(request, settings):
+    settings.POST_SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, search_backend):
+    def make(title, text="Обычный текст", **kwargs):
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user, **kwargs)
+    return make
+
+
+def _search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return list(response.context["page_obj"])
+
+
+def test_search_ranks_title_matches_first(client, make_post):
+    in_text = make_post("Заметка", text="про кометы и звёзды")
+    in_title = make_post("Кометы", text="про небо")
+    make_post("Другое", text="ничего общего")
+    assert _search(client, "кометы") == [in_title, in_text], (
+        "Убедитесь, что поиск находит посты по заголовку и тексту, а"
+        " совпадения в заголовке стоят выше."
+    )
+
+
+def test_search_requires_all_words(client, make_post):
+    both = make_post("Горы", text="Поход в горы летом")
+    make_post("Горы", text="Зимой")
+    assert _search(client, "горы летом") == [both]
+
+
+def test_search_respects_visibility(
+        client, mixer, make_post, published_category
+):
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    visible = make_post("Видимый вулкан")
+    make_post("Снятый вулкан", is_published=False)
+    make_post("Будущий вулкан", pub_date=timezone.now() + timedelta(days=1))
+    make_post("Скрытый вулкан", category=hidden_category)
+    assert _search(client, "вулкан") == [visible], (
+        "Убедитесь, что поиск показывает только посты, видимые в лентах."
+    )
+
+
+def test_index_follows_edits_and_deletes(client, make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert _search(client, "старый") == []
+    assert _search(client, "новый") == [post]
+    post.delete()
+    assert _search(client, "новый") == []
+
+
+def test_search_matches_inflected_forms(client, make_post):
+    post = make_post("Полёт к кометам", text="Мы наблюдали яркую комету")
+    assert _search(client, "комета") == [post], (
+        "Убедитесь, что поиск находит другие падежные формы слова."
+    )
+    assert _search(client, "полет") == [post]
+    assert _search(client, "наблюдения кометы") == []
+    assert _search(client, "наблюдать кометы") == [post]
+
+
+def test_stop_words_only_query_finds_nothing(client, make_post):
+    make_post("Что и как")
+    assert _search(client, "что и как") == []
+
+
+def test_comments_are_searchable(client, mixer, make_post):
+    post = make_post("Пост без ключевого слова")
+    comment = mixer.blend("blog.Comment", post=post, text="Про ледоколы")
+    run_jobs()
+    assert _search(client, "ледокол") == [post], (
+        "Убедитесь, что поиск учитывает текст комментариев к посту."
+    )
+    comment.delete()
+    run_jobs()
+    assert _search(client, "ледокол") == []
+
+
+def get_index_rows(search_backend):
+    if search_backend == "inverted":
+        return sorted(PostSearchTerm.objects.values_list(
+            "post_id", "term", "weight"))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid, title, text, comments FROM {FTS_TABLE}")
+        return sorted(
+            (row[0], *(sorted(value.split()) for value in row[1:]))
+            for row in cursor.fetchall()
+        )
+
+
+def test_comment_changes_indexed_incrementally(
+        client, mixer, make_post, search_backend):
+    post = make_post("Пост", text="Про ледоколы")
+    other = make_post("Другой пост")
+    mixer.cycle(3).blend("blog.Comment", post=post, text="Про ледоколы")
+    with CaptureQueriesContext(connection) as queries:
+        comment = mixer.blend("blog.Comment", post=post, text="Про айсберги")
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.text = "Про торосы"
+        comment.save()
+    assert not any(
+        "FROM \"blog_comment\"" in query["sql"]
+        and "WHERE \"blog_comment\".\"id\"" not in query["sql"]
+        for query in queries
+    ), (
+        "Убедитесь, что при добавлении и изменении комментария в индекс"
+        " добавляются только его термы, а остальные комментарии поста"
+        " заново не читаются."
+    )
+    assert not Job.objects.exists()
+    assert _search(client, "торосы") == [post]
+    assert _search(client, "айсберги") == []
+    Comment.objects.filter(post=post).first().delete()
+    Comment.objects.get(pk=comment.pk).delete()
+    other.delete()
+    incremental = get_index_rows(search_backend)
+    call_command("rebuild_search_index")
+    assert incremental == get_index_rows(search_backend), (
+        "Убедитесь, что индекс после изменений комментариев совпадает с"
+        " построенным заново."
+    )
+    post.delete()
+    assert get_index_rows(search_backend) == []
+
+
+def test_post_save_without_text_changes_keeps_index(make_post, mixer):
+    post = make_post("Пост")
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    post = Post.objects.get(pk=post.pk)
+    post.is_published = False
+    with CaptureQueriesContext(connection) as queries:
+        post.save()
+    assert not any(
+        "blog_comment" in query["sql"]
+        or FTS_TABLE in query["sql"]
+        or "blog_postsearchterm" in query["sql"]
+        for query in queries
+    ), (
+        "Убедитесь, что сохранение поста без изменения заголовка и текста"
+        " не переиндексирует пост."
+    )
+
+
+def test_search_pagination_keeps_query(client, make_post):
+    for i in range(12):
+        make_post(f"Озеро {i}")
+    first = client.get("/search/", {"q": "озеро"})
+    assert len(first.context["page_obj"]) == 10
+    assert "?q=%D0%BE%D0%B7%D0%B5%D1%80%D0%BE&amp;page=2" in (
+        first.content.decode()), (
+        "Убедитесь, что ссылки пагинации результатов поиска сохраняют запрос."
+    )
+    assert len(_search(client, "озеро", page=2)) == 2
+
+
+def test_empty_query_shows_form_only(client, make_post):
+    make_post("Пост")
+    assert _search(client, "   ") == []
+
+
+def test_admin_search_uses_index(make_post):
+    post = make_post("Ледник", text="Текст")
+    make_post("Пустыня")
+    admin = get_user_model().objects.create_superuser(
+        "admin", "admin@example.com", "password")
+    client = Client()
+    client.force_login(admin)
+    response = client.get("/admin/blog/post/", {"q": "ледник"})
+    assert list(response.context["cl"].result_list) == [post]
+
+
+def test_rebuild_search_index(client, make_post):
+    post = make_post("Пустыня")
+    Post.objects.filter(pk=post.pk).update(title="Оазис")
+    call_command("rebuild_search_index")
+    assert _search(client, "оазис") == [Post.objects.get(pk=post.pk)]
+    assert _search(client, "пустыня") == []
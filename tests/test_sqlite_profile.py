@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.db import get_sqlite_profile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_profile_pragmas_order(settings):
+    settings.SQLITE_PROFILES = {
+        "test": {"pragmas": {"temp_store": "MEMORY", "journal_mode": "WAL",
+                             "busy_timeout": 100}},
+    }
+    profile = get_sqlite_profile("test")
+    assert [name for name, _ in profile["pragmas"]] == [
+        "busy_timeout", "journal_mode", "temp_store"], (
+        "Убедитесь, что busy_timeout выполняется до смены журнала."
+    )
+    assert profile["transaction_mode"] == "DEFERRED"
+
+
+def test_connection_uses_production_profile():
+    with connection.cursor() as cursor:
+        for pragma, expected in [
+            ("busy_timeout", 5000),
+            ("synchronous", 1),
+            ("temp_store", 2),
+            ("cache_size", -64 * 1024),
+        ]:
+            cursor.execute(f"PRAGMA {pragma}")
+            assert cursor.fetchone()[0] == expected, (
+                f"Убедитесь, что соединение выполняет PRAGMA {pragma}."
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atomic_begins_immediate_transaction():
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            connection.cursor().execute("SELECT 1")
+    assert queries.captured_queries[0]["sql"] == "BEGIN IMMEDIATE", (
+        "Убедитесь, что транзакции SQLite сразу берут блокировку на запись."
+    )
+
+
+def test_bench_sqlite_command(capsys):
+    call_command(
+        "bench_sqlite", "--writers=1", "--readers=1", "--duration=0.2")
+    output = capsys.readouterr().out
+    assert "default:" in output and "production:" in output
@@ -0,0 +1,86 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+
+from core.templatetags.static_assets import is_vendored
+
+CSS = "body { color: black; }\n" * 200
+
+
+@pytest.fixture
+def static_source(tmp_path):
+    source = tmp_path / "src"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "site.css").write_text(CSS)
+    return source
+
+
+@pytest.fixture
+def collected(settings, tmp_path, static_source):
+    settings.STATICFILES_DIRS = [static_source]
+    settings.STATIC_ROOT = tmp_path / "out"
+    settings.STATICFILES_STORAGE = (
+        "core.storage.CompressedManifestStaticFilesStorage")
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return settings.STATIC_ROOT
+
+
+def _hashed_css(root):
+    (path,) = (root / "css").glob("site.*.css")
+    return path
+
+
+def test_collectstatic_fingerprints_and_compresses(collected):
+    hashed = _hashed_css(collected)
+    assert (collected / "staticfiles.json").exists()
+    compressed = hashed.with_name(hashed.name + ".gz")
+    assert compressed.exists(), (
+        "Убедитесь, что collectstatic сохраняет сжатые gzip копии файлов."
+    )
+    assert gzip.decompress(compressed.read_bytes()).decode() == CSS
+
+
+def test_serve_precompressed_immutable(client, collected):
+    url = f"/static/css/{_hashed_css(collected).name}"
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы статики с хешем в имени кэшируются навсегда."
+    )
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body).decode() == CSS
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+    assert not response.has_header("Content-Encoding")
+    assert b"".join(response.streaming_content).decode() == CSS
+
+    response = client.get("/static/css/site.css")
+    assert "immutable" not in response["Cache-Control"]
+    assert client.get("/static/css/missing.css").status_code == 404
+
+
+def test_bootstrap_from_vendored_static(settings, static_source):
+    template = Template(
+        "{% load static_assets %}{% bootstrap_stylesheet %}"
+        "{% bootstrap_script %}")
+    is_vendored.cache_clear()
+    settings.STATICFILES_DIRS = [static_source]
+    assert "cdn.jsdelivr.net" in template.render(Context())
+
+    vendor = static_source / "vendor" / "bootstrap"
+    (vendor / "css").mkdir(parents=True)
+    (vendor / "js").mkdir()
+    (vendor / "css" / "bootstrap.min.css").write_text("")
+    (vendor / "js" / "bootstrap.bundle.min.js").write_text("")
+    is_vendored.cache_clear()
+    content = template.render(Context())
+    is_vendored.cache_clear()
+    assert "cdn.jsdelivr.net" not in content, (
+        "Убедитесь, что Bootstrap подключается из статики проекта, если "
+        "его файлы там есть."
+    )
+    assert "/static/vendor/bootstrap/css/bootstrap.min.css" in content
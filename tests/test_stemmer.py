@@ -0,0 +1,32 @@
+import pytest
+
+from core.stemmer import stem, tokenize
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("важнейшими", "важн"),
+    ("взволнованная", "взволнова"),
+    ("возвратившись", "возврат"),
+    ("национальность", "национальн"),
+    ("прекрасное", "прекрасн"),
+    ("бегающий", "бега"),
+    ("вагон", "вагон"),
+])
+def test_snowball_stems(word, expected):
+    assert stem(word) == expected
+
+
+def test_inflected_forms_share_stem():
+    forms = ("комета", "кометы", "комете", "кометой", "кометами", "кометах")
+    assert {stem(form) for form in forms} == {"комет"}, (
+        "Убедитесь, что падежные формы слова сводятся к одной основе."
+    )
+
+
+def test_tokenize_folds_yo_and_drops_stop_words():
+    assert tokenize("Ёлки и её ЁЖИК в лесу") == ["елк", "ежик", "лес"]
+    assert tokenize("Ёлка") == tokenize("елка")
+
+
+def test_tokenize_keeps_latin_and_numbers():
+    assert tokenize("Django 3.2 и Python") == ["django", "3", "2", "python"]
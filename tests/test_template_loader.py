@@ -0,0 +1,59 @@
+from django.template import Context, Engine
+
+from blog.management.commands.bench_templates import (
+    LOADER_CONFIGS,
+    Command,
+    get_posts,
+)
+
+TEMPLATES = {
+    "page.html": (
+        '{% include "card.html" %}|'
+        '{% include "card.html" with name="Вася" %}|'
+        '{% include "card.html" with name="Петя" only %}|'
+        '{% include "url.html" %}'
+    ),
+    "card.html": "[{{ name }}{% include 'link.html' %}]",
+    "link.html": "<{{ name }}>",
+    "url.html": "{% firstof name as value %}{{ value }}",
+}
+
+
+def get_engine(inline):
+    loaders = [("django.template.loaders.locmem.Loader", TEMPLATES)]
+    if inline:
+        loaders = [("core.loaders.InlineIncludeLoader", loaders)]
+    return Engine(loaders=[
+        ("django.template.loaders.cached.Loader", loaders),
+    ])
+
+
+def test_inline_loader_keeps_output():
+    context = {"name": "Аня"}
+    expected = get_engine(False).get_template("page.html").render(
+        Context(context))
+    template = get_engine(True).get_template("page.html")
+    assert template.render(Context(context)) == expected, (
+        "Убедитесь, что встраивание include не меняет результат отрисовки."
+    )
+    assert template.source.count("{% include") == 2, (
+        "Убедитесь, что include с only и шаблоны с присваиванием "
+        "переменных не встраиваются, а остальные встраиваются."
+    )
+
+
+def test_index_post_cards_are_inlined(rf):
+    command = Command()
+    request = rf.get("/")
+    request.user = None
+    posts = get_posts(3)
+    context = {"page_obj": posts, "page_params": ""}
+    rendered = {}
+    for name in ("default", "cached+inline"):
+        engine = command.get_engine(LOADER_CONFIGS[name])
+        template = engine.get_template("blog/index.html")
+        rendered[name] = template.render(context, request)
+    assert rendered["default"] == rendered["cached+inline"]
+    assert "post_card.html" not in template.template.source, (
+        "Убедитесь, что карточка поста встраивается в шаблон ленты."
+    )
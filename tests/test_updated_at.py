@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Category, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _age(instance, days=1):
+    """Move `updated_at` into the past bypassing the automatic update."""
+    past = timezone.now() - timedelta(days=days)
+    type(instance).objects.filter(pk=instance.pk).update(updated_at=past)
+    instance.refresh_from_db()
+    return past
+
+
+def test_save_and_bulk_update_touch_updated_at(post_with_published_location):
+    post = post_with_published_location
+    past = _age(post)
+    post.title = "Новый заголовок"
+    post.save()
+    assert post.updated_at > past
+
+    past = _age(post)
+    type(post).objects.filter(pk=post.pk).update(is_published=False)
+    post.refresh_from_db()
+    assert post.updated_at > past, (
+        "Убедитесь, что QuerySet.update() обновляет поле `updated_at`."
+    )
+
+
+def test_admin_list_editable_touches_updated_at(published_category):
+    admin = get_user_model().objects.create_superuser(
+        "admin", "admin@example.com", "password")
+    client = Client()
+    client.force_login(admin)
+    past = _age(published_category)
+    response = client.post("/admin/blog/category/", {
+        "form-TOTAL_FORMS": "1",
+        "form-INITIAL_FORMS": "1",
+        "form-0-id": str(published_category.pk),
+        "_save": "Сохранить",
+    })
+    assert response.status_code == 302
+    published_category.refresh_from_db()
+    assert not published_category.is_published
+    assert published_category.updated_at > past
+
+
+def test_comment_changes_touch_post(mixer, post_with_published_location):
+    post = post_with_published_location
+    past = _age(post)
+    comment = mixer.blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.updated_at > past
+
+    past = _age(post)
+    comment.text = "Исправленный текст"
+    comment.save()
+    post.refresh_from_db()
+    assert post.updated_at > past, (
+        "Убедитесь, что редактирование комментария обновляет `updated_at`"
+        " поста."
+    )
+
+
+def test_etag_changes_after_post_edit(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = user_client.get(url)["ETag"]
+    post.text = "Отредактированный текст"
+    post.save()
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_sample_data_loads():
+    call_command(
+        "loaddata", settings.BASE_DIR.parent / "db.json", verbosity=0)
+    for model in (Category, Location, Post):
+        assert model.objects.exists()
+        assert not model.objects.filter(updated_at__isnull=True).exists(), (
+            "Убедитесь, что у записей из `db.json` заполнено `updated_at`."
+        )